@@ -1,14 +1,21 @@
-from typing import List, Optional
+import operator
+from typing import Annotated, List, Optional
 from langgraph.graph import MessagesState
 
 
+def latest_step(current: Optional[str], update: Optional[str]) -> Optional[str]:
+    """Reducer for `current_step`: parallel nodes may all report a step in the same superstep."""
+    return update if update is not None else current
+
+
 class ResumeAnalysisState(MessagesState):
     # Inputs
     resume_text: str
     job_description: str
     company_name: str
     position: str
-    current_step: str
+    current_step: Annotated[str, latest_step]
+    completed_steps: Annotated[List[str], operator.add] = []
 
     # Job fit
     job_fit_score: Optional[int] = None
@@ -1,10 +1,9 @@
-from langgraph.graph import StateGraph, END
-from app.llm_module.llm_caller import LLMCaller
-from app.llm_module.client_manager import LLMClientManager
+from langgraph.graph import StateGraph, START, END
+from app.agents.state import ResumeAnalysisState
+from app.llm_module.llm_caller import get_default_llm_caller
 import json
 
-client_manager = LLMClientManager()
-llm_caller = LLMCaller(client_manager)
+llm_caller = get_default_llm_caller()
 
 
 def _extract_json_field(output: str, field: str, default):
@@ -43,13 +42,15 @@ Provide JSON with:
     res = llm_caller.llm_call("gemini-2.5-flash", messages)
     output = res.choices[0].message.content
 
-    state["job_fit_score"] = _extract_json_field(output, "score", 70)
-    state["strengths"] = _extract_json_field(output, "strengths", [])
-    state["improvements"] = _extract_json_field(output, "improvements", [])
-    state["missing_keywords"] = _extract_json_field(output, "missingKeywords", [])
-    state["recommendations"] = _extract_json_field(output, "recommendations", [])
-    state["current_step"] = "job_fit_done"
-    return state
+    return {
+        "job_fit_score": _extract_json_field(output, "score", 70),
+        "strengths": _extract_json_field(output, "strengths", []),
+        "improvements": _extract_json_field(output, "improvements", []),
+        "missing_keywords": _extract_json_field(output, "missingKeywords", []),
+        "recommendations": _extract_json_field(output, "recommendations", []),
+        "current_step": "job_fit_done",
+        "completed_steps": ["job_fit"],
+    }
 
 
 # -------------------------------
@@ -73,11 +74,13 @@ Provide JSON with:
     res = llm_caller.llm_call("gemini-2.5-flash", messages)
     output = res.choices[0].message.content
 
-    state["technical_questions"] = _extract_json_field(output, "technicalQuestions", [])
-    state["behavioral_questions"] = _extract_json_field(output, "behavioralQuestions", [])
-    state["company_specific_questions"] = _extract_json_field(output, "companySpecificQuestions", [])
-    state["current_step"] = "interview_prep_done"
-    return state
+    return {
+        "technical_questions": _extract_json_field(output, "technicalQuestions", []),
+        "behavioral_questions": _extract_json_field(output, "behavioralQuestions", []),
+        "company_specific_questions": _extract_json_field(output, "companySpecificQuestions", []),
+        "current_step": "interview_prep_done",
+        "completed_steps": ["interview_prep"],
+    }
 
 
 # -------------------------------
@@ -98,11 +101,13 @@ Provide JSON with:
     res = llm_caller.llm_call("gemini-2.5-flash", messages)
     output = res.choices[0].message.content
 
-    state["hiring_trends"] = _extract_json_field(output, "hiringTrends", [])
-    state["interview_process"] = _extract_json_field(output, "interviewProcess", [])
-    state["employee_experiences"] = _extract_json_field(output, "employeeExperiences", [])
-    state["current_step"] = "company_insights_done"
-    return state
+    return {
+        "hiring_trends": _extract_json_field(output, "hiringTrends", []),
+        "interview_process": _extract_json_field(output, "interviewProcess", []),
+        "employee_experiences": _extract_json_field(output, "employeeExperiences", []),
+        "current_step": "company_insights_done",
+        "completed_steps": ["company_insights"],
+    }
 
 
 # -------------------------------
@@ -122,26 +127,29 @@ Provide JSON with:
     res = llm_caller.llm_call("gemini-2.5-flash", messages)
     output = res.choices[0].message.content
 
-    state["latest_news"] = _extract_json_field(output, "latestNews", [])
-    state["recent_experiences"] = _extract_json_field(output, "recentExperiences", [])
-    state["current_step"] = "web_research_done"
-    return state
+    return {
+        "latest_news": _extract_json_field(output, "latestNews", []),
+        "recent_experiences": _extract_json_field(output, "recentExperiences", []),
+        "current_step": "web_research_done",
+        "completed_steps": ["web_research"],
+    }
 
 
 # -------------------------------
 # Build the LangGraph workflow
 # -------------------------------
-workflow = StateGraph(dict)
+# The four nodes only read the inputs and write disjoint keys, so they fan out
+# from START and run in the same superstep; the graph finishes once all of them
+# have joined at END. Shared keys are merged by the reducers in ResumeAnalysisState.
+workflow = StateGraph(ResumeAnalysisState)
 
 workflow.add_node("job_fit", job_fit_node)
 workflow.add_node("interview_prep", interview_prep_node)
 workflow.add_node("company_insights", company_insights_node)
 workflow.add_node("web_research", web_research_node)
 
-workflow.set_entry_point("job_fit")
-workflow.add_edge("job_fit", "interview_prep")
-workflow.add_edge("interview_prep", "company_insights")
-workflow.add_edge("company_insights", "web_research")
-workflow.add_edge("web_research", END)
+for node in ("job_fit", "interview_prep", "company_insights", "web_research"):
+    workflow.add_edge(START, node)
+    workflow.add_edge(node, END)
 
 resume_workflow = workflow.compile()
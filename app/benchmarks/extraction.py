@@ -0,0 +1,100 @@
+"""Extraction benchmark on a fixed corpus of saved HTML pages.
+
+    python -m app.benchmarks.extraction --corpus saved_pages/ --processes 4
+    python -m app.benchmarks.extraction --pipeline   # also fetch from the local stand-in while extracting
+
+"threads" is the original layout: trafilatura inside the fetch threads, so the GIL serializes it.
+"processes" ships raw bytes to a ProcessPoolExecutor as extract_page_async does. --pipeline runs
+fetch + extract end to end both ways against app.benchmarks.pages.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+from ..queue.extraction import extract_page, EXTRACT_PROCESSES, EXTRACT_START_METHOD
+from ..queue.fetcher import AsyncPageFetcher
+from .fetch import THREADS_CONCURRENCY
+from .pages import load_corpus, serve_pages
+
+
+async def extract_all(pages: List[bytes], executor: Executor) -> int:
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(executor, extract_page, f"page-{i}", body, "utf-8") for i, body in enumerate(pages)
+    ])
+    return sum(len(r["text"]) for r in results)
+
+
+def _fetch_and_extract_blocking(url: str) -> int:
+    import requests
+    html = requests.get(url, timeout=15).content
+    return len(extract_page(url, html, "utf-8")["text"])
+
+
+async def pipeline_threads(urls: List[str]) -> int:
+    sem = asyncio.Semaphore(THREADS_CONCURRENCY)
+
+    async def one(url: str) -> int:
+        async with sem:
+            return await asyncio.to_thread(_fetch_and_extract_blocking, url)
+
+    return sum(await asyncio.gather(*[one(u) for u in urls]))
+
+
+async def pipeline_processes(urls: List[str], pool: Executor) -> int:
+    loop = asyncio.get_running_loop()
+
+    async def one(url: str, fetcher: AsyncPageFetcher) -> int:
+        result = await fetcher.fetch(url)
+        # Extraction of this page overlaps with the fetches still in flight.
+        extracted = await loop.run_in_executor(pool, extract_page, url, result["body"], result.get("charset"))
+        return len(extracted["text"])
+
+    async with AsyncPageFetcher() as fetcher:
+        return sum(await asyncio.gather(*[one(u, fetcher) for u in urls]))
+
+
+async def run(args):
+    pages = load_corpus(args.corpus, args.pages)
+    pool = ProcessPoolExecutor(max_workers=args.processes, mp_context=multiprocessing.get_context(EXTRACT_START_METHOD))
+    try:
+        # Start the workers (and import trafilatura in them) before timing.
+        await extract_all(pages[:args.processes], pool)
+
+        with ThreadPoolExecutor(THREADS_CONCURRENCY) as threads:
+            start = time.perf_counter()
+            chars = await extract_all(pages, threads)
+            print(f"[Bench] threads        {time.perf_counter() - start:6.2f}s for {len(pages)} pages ({chars} chars)")
+        start = time.perf_counter()
+        chars = await extract_all(pages, pool)
+        print(f"[Bench] processes x{args.processes:<3d} {time.perf_counter() - start:6.2f}s for {len(pages)} pages ({chars} chars)")
+
+        if args.pipeline:
+            async with serve_pages(pages, args.hosts, args.latency) as (urls, _):
+                start = time.perf_counter()
+                await pipeline_threads(urls)
+                print(f"[Bench] fetch+extract, threads   {time.perf_counter() - start:6.2f}s")
+                start = time.perf_counter()
+                await pipeline_processes(urls, pool)
+                print(f"[Bench] fetch+extract, pipelined {time.perf_counter() - start:6.2f}s")
+    finally:
+        pool.shutdown(wait=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="trafilatura extraction: threads vs a process pool.")
+    parser.add_argument("--corpus", help="Directory of saved .html pages; synthetic pages otherwise")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--processes", type=int, default=max(EXTRACT_PROCESSES, 1))
+    parser.add_argument("--pipeline", action="store_true", help="Also time fetch + extract end to end")
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
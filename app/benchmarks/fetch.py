@@ -0,0 +1,85 @@
+"""Fetch benchmark: the original requests-in-threads path vs the pooled AsyncPageFetcher.
+
+    python -m app.benchmarks.fetch --pages 30 --latency 0.1
+    python -m app.benchmarks.fetch --with-cache   # also time the Mongo page cache (needs MONGO_URL)
+
+Pages come from a local stand-in server (see app.benchmarks.pages), optionally a directory of
+saved HTML with --corpus. Reported: wall time, requests and TCP connections seen by the server.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import List, Optional
+import requests
+from ..queue.fetcher import AsyncPageFetcher, USER_AGENT
+from .pages import load_corpus, serve_pages
+
+# Concurrency of the original thread-based fetch stage.
+THREADS_CONCURRENCY = 6
+
+
+def _get_blocking(url: str) -> int:
+    # What fetch_and_extract_blocking did: a new connection per URL, no session.
+    resp = requests.get(url, timeout=15, headers={"User-Agent": USER_AGENT})
+    return len(resp.content)
+
+
+async def fetch_threads(urls: List[str]) -> str:
+    sem = asyncio.Semaphore(THREADS_CONCURRENCY)
+
+    async def one(url: str) -> int:
+        async with sem:
+            return await asyncio.to_thread(_get_blocking, url)
+
+    return f"bytes={sum(await asyncio.gather(*[one(u) for u in urls]))}"
+
+
+async def fetch_pooled(urls: List[str]) -> str:
+    async with AsyncPageFetcher() as fetcher:
+        results = await asyncio.gather(*[fetcher.fetch(u) for u in urls])
+    return f"bytes={sum(len(r.get('body') or b'') for r in results)}"
+
+
+async def fetch_cached(urls: List[str]) -> str:
+    from ..queue.worker_agent import fetch_and_extract
+    async with AsyncPageFetcher() as fetcher:
+        results = await asyncio.gather(*[fetch_and_extract(u, fetcher) for u in urls])
+    return f"served_from_cache={sum(1 for r in results if r.get('cached'))}"
+
+
+async def run(args):
+    pages = load_corpus(args.corpus, args.pages)
+    modes = [("threads", fetch_threads), ("pooled", fetch_pooled)]
+    if args.with_cache:
+        modes += [("cache cold", fetch_cached), ("cache warm", fetch_cached)]
+    async with serve_pages(pages, args.hosts, args.latency) as (urls, stats):
+        if args.with_cache:
+            from ..db.collections.pages import pages_collection
+            await pages_collection.delete_many({"url": {"$in": urls}})
+        try:
+            for name, fn in modes:
+                before = dict(stats)
+                start = time.perf_counter()
+                out = await fn(urls)
+                elapsed = time.perf_counter() - start
+                print(f"[Bench] {name:10s} {elapsed:6.2f}s  requests={stats['requests'] - before['requests']:3d}  "
+                      f"connections={stats['connections'] - before['connections']:3d}  {out}")
+        finally:
+            if args.with_cache:
+                await pages_collection.delete_many({"url": {"$in": urls}})
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Thread-per-request vs pooled async page fetching.")
+    parser.add_argument("--pages", type=int, default=30)
+    parser.add_argument("--hosts", type=int, default=10, help="Distinct stand-in hosts (ports)")
+    parser.add_argument("--latency", type=float, default=0.1, help="Server delay per response, seconds")
+    parser.add_argument("--corpus", help="Directory of saved .html pages; synthetic pages otherwise")
+    parser.add_argument("--with-cache", action="store_true", help="Also time fetch_and_extract with the page cache")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
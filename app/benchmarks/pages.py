@@ -0,0 +1,70 @@
+"""Local stand-in for the web: saved or synthetic HTML pages served over HTTP on several ports.
+
+Each port counts as a separate host for per-host connection limits. Shared by the fetch and
+extraction benchmarks.
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from aiohttp import web
+
+_WORDS = ("interview", "process", "candidate", "onsite", "recruiter", "system", "design", "coding",
+          "salary", "team", "culture", "manager", "offer", "round", "question", "experience")
+
+
+def synthetic_page(i: int, paragraphs: int = 60) -> bytes:
+    """An article-like page (~40 KB with the defaults) with navigation boilerplate around it."""
+    body = "".join(
+        "<p>" + " ".join(_WORDS[(i + p * 7 + w) % len(_WORDS)] for w in range(90)) + ".</p>"
+        for p in range(paragraphs)
+    )
+    nav = "".join(f"<li><a href='/n{n}'>Link {n}</a></li>" for n in range(40))
+    return (f"<html><head><title>Page {i}</title></head><body><nav><ul>{nav}</ul></nav>"
+            f"<article><h1>Interview report {i}</h1>{body}</article><footer>Footer</footer></body></html>").encode()
+
+
+def load_corpus(corpus_dir: Optional[str], count: int) -> List[bytes]:
+    """Saved *.html pages from `corpus_dir` (cycled up to `count`), or synthetic pages."""
+    if not corpus_dir:
+        return [synthetic_page(i) for i in range(count)]
+    names = sorted(n for n in os.listdir(corpus_dir) if n.endswith((".html", ".htm")))
+    if not names:
+        raise SystemExit(f"no .html files in {corpus_dir}")
+    pages = []
+    for name in names:
+        with open(os.path.join(corpus_dir, name), "rb") as f:
+            pages.append(f.read())
+    return [pages[i % len(pages)] for i in range(count)]
+
+
+@asynccontextmanager
+async def serve_pages(pages: List[bytes], hosts: int = 10, latency: float = 0.1,
+                      base_port: int = 18080) -> AsyncIterator[Tuple[List[str], Dict[str, int]]]:
+    """Serve `pages` round-robin across `hosts` ports, each response delayed by `latency` seconds.
+
+    Yields the page URLs and live counters of requests and distinct client connections.
+    """
+    stats = {"requests": 0, "connections": 0}
+    peers = set()
+
+    async def handler(request: web.Request) -> web.Response:
+        peer = request.transport.get_extra_info("peername") if request.transport else None
+        if peer not in peers:
+            peers.add(peer)
+            stats["connections"] = len(peers)
+        stats["requests"] += 1
+        await asyncio.sleep(latency)
+        return web.Response(body=pages[int(request.match_info["i"])], content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/page/{i}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        for h in range(hosts):
+            await web.TCPSite(runner, "127.0.0.1", base_port + h).start()
+        urls = [f"http://127.0.0.1:{base_port + i % hosts}/page/{i}" for i in range(len(pages))]
+        yield urls, stats
+    finally:
+        await runner.cleanup()
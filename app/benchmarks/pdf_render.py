@@ -0,0 +1,119 @@
+"""PDF rasterization benchmark: memory and latency, original path vs render_pages_b64.
+
+    python -m app.benchmarks.pdf_render resume.pdf long.pdf
+    python -m app.benchmarks.pdf_render --synthetic-pages 1 20
+
+"original" is what process_file used to do: convert_from_path on every page at pdf2image's
+default DPI, save each page as a JPEG on disk, read page 0 back and base64 it. "current" renders
+only the first page straight to an in-memory JPEG. Each measurement runs in a fresh process so
+peak RSS is its own; pdftoppm's peak is reported separately since it runs as a child process.
+Needs poppler-utils, as the workers do.
+"""
+import argparse
+import base64
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Optional, Tuple
+from PIL import Image, ImageDraw
+
+
+def synthetic_pdf(path: str, pages: int, dpi: int = 150):
+    """A scanned-style PDF: each page is a full-page image of text lines."""
+    width, height = int(8.27 * dpi), int(11.69 * dpi)
+    images = []
+    for p in range(pages):
+        image = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(image)
+        for line in range(60):
+            draw.text((80, 80 + line * 30), f"Page {p + 1} line {line + 1}: experience, skills, projects " * 2, fill="black")
+        images.append(image)
+    images[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+
+
+def _original(path: str) -> int:
+    from pdf2image import convert_from_path
+    out_dir = tempfile.mkdtemp()
+    try:
+        img_paths = []
+        for i, page in enumerate(convert_from_path(path)):
+            img_path = os.path.join(out_dir, f"img-{i}.jpg")
+            page.save(img_path, "JPEG")
+            img_paths.append(img_path)
+        with open(img_paths[0], "rb") as f:
+            return len(base64.b64encode(f.read()))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def _current(path: str) -> int:
+    from ..utils.pdf import render_pages_b64
+    return sum(len(p) for p in render_pages_b64(path, 1))
+
+
+def _measure(mode: str, path: str, conn):
+    fn = _original if mode == "original" else _current
+    try:
+        start = time.perf_counter()
+        payload = fn(path)
+        elapsed = time.perf_counter() - start
+        # ru_maxrss is in KiB on Linux.
+        conn.send((elapsed, payload, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss))
+    except Exception as e:
+        conn.send(RuntimeError(f"{mode} failed: {e}"))
+    finally:
+        conn.close()
+
+
+def measure(mode: str, path: str) -> Tuple[float, int, int, int]:
+    ctx = multiprocessing.get_context("forkserver")
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_measure, args=(mode, path, child))
+    proc.start()
+    # Drop our copy of the child's end so recv() sees EOF if the child dies.
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        raise RuntimeError(f"{mode} measurement of {path} crashed")
+    finally:
+        proc.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Memory and latency of PDF page rendering.")
+    parser.add_argument("pdfs", nargs="*", help="Sample PDFs")
+    parser.add_argument("--synthetic-pages", type=int, nargs="*", default=[],
+                        help="Also generate scanned-style PDFs with these page counts")
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        pdfs = list(args.pdfs)
+        for n in args.synthetic_pages:
+            path = os.path.join(tmp_dir, f"synthetic-{n}p.pdf")
+            synthetic_pdf(path, n)
+            pdfs.append(path)
+        if not pdfs:
+            parser.error("give sample PDFs or --synthetic-pages")
+
+        for path in pdfs:
+            for mode in ("original", "current"):
+                elapsed, payload, rss_kib, child_kib = measure(mode, path)
+                print(f"[Bench] {os.path.basename(path)} {mode:8s} {elapsed * 1000:7.0f} ms  "
+                      f"peak RSS {rss_kib / 1024:6.1f} MiB  pdftoppm {child_kib / 1024:6.1f} MiB  "
+                      f"base64 {payload} bytes")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
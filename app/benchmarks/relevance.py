@@ -0,0 +1,47 @@
+"""Prompt size benchmark: tokens per page before and after relevance selection.
+
+    python -m app.benchmarks.relevance <corpus_dir> --company X --role Y
+
+Each *.txt in corpus_dir is a saved page text. Reported per page and in total: raw tokens,
+tokens after the original [:30000] slice, and tokens after select_relevant_text, plus the
+time selection took.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+from ..utils.relevance import count_tokens, select_relevant_text, RELEVANCE_DOC_TOKEN_BUDGET, RESEARCH_INTENT
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Prompt size before and after relevance selection on saved pages.")
+    parser.add_argument("corpus_dir", help="Directory of saved page texts (*.txt)")
+    parser.add_argument("--company", required=True)
+    parser.add_argument("--role", required=True)
+    parser.add_argument("--intent", default=RESEARCH_INTENT, help="Defaults to what the agent worker uses")
+    parser.add_argument("--budget", type=int, default=RELEVANCE_DOC_TOKEN_BUDGET)
+    args = parser.parse_args(argv)
+
+    query = f"{args.company} {args.role} {args.intent}"
+    names = sorted(n for n in os.listdir(args.corpus_dir) if n.endswith(".txt"))
+    total_before = total_sliced = total_after = 0
+    elapsed = 0.0
+    for name in names:
+        with open(os.path.join(args.corpus_dir, name), encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        start = time.perf_counter()
+        selected = select_relevant_text(text, query, args.budget)
+        elapsed += time.perf_counter() - start
+        before, sliced, after = count_tokens(text), count_tokens(text[:30000]), count_tokens(selected)
+        total_before += before
+        total_sliced += sliced
+        total_after += after
+        print(f"{name}: {before} tokens, {sliced} with [:30000], {after} selected")
+
+    print(f"[Bench] {len(names)} docs: {total_before} tokens raw, {total_sliced} with [:30000], "
+          f"{total_after} selected; selection took {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Bytes sent over /stream for one job: full snapshot every poll (before) vs deltas (after).
+
+    python -m app.benchmarks.sse_bytes                 # synthetic job
+    python -m app.benchmarks.sse_bytes --file-id <id>  # replay towards a finished upload's document
+
+The job is a timeline of worker writes: agent progress entries, the job-fit result part way
+through and the research result at the end. "Before" is the original generator (whole document
+plus a `data: {}` heartbeat every 2s tick); "after" is one delta per write plus a heartbeat
+comment per idle HEARTBEAT_INTERVAL, exactly as the current generator formats them.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from ..server import STREAM_FIELDS, HEARTBEAT_INTERVAL, _stream_delta, _event_id
+from ..db.collections.files import get_file_fields
+
+JOBFIT_FIELDS = ("result", "score", "strengths", "weaknesses", "areas_for_improvement",
+                 "cv_optimization_suggestions", "keywords_already_matched", "missing_keywords_to_add")
+RESEARCH_FIELDS = ("company_insights", "interview_prep", "web_research")
+
+
+def synthetic_final() -> Dict[str, Any]:
+    items = [f"A reasonably detailed point number {i} about the candidate or the company." for i in range(8)]
+    return {
+        "status": "processed", "jobfit_status": "processed", "insights_status": "processed", "agent_stage": "done",
+        "agent_progress": [{"stage": s, "status": "done", "items_count": 20}
+                           for s in ("discovery", "fetch", "summarize", "aggregate")],
+        "result": "Overall the candidate is a good fit. " * 20, "score": 78,
+        **{f: items for f in JOBFIT_FIELDS[2:]},
+        "company_insights": {"hiring_trends": items, "interview_process": items, "employee_experiences": items},
+        "interview_prep": {"technical_questions": items, "behavioral_questions": items,
+                           "company_specific_questions": items, "prep_tips": items},
+        "web_research": {"latest_news": items},
+    }
+
+
+def timeline(final: Dict[str, Any], duration: float, jobfit_at: float) -> List[Tuple[float, Dict[str, Any]]]:
+    """(time, document) after each worker write, ending in `final`."""
+    doc = {f: copy.deepcopy(d) for f, d in STREAM_FIELDS.items()}
+    doc.update(status="processing", jobfit_status="processing", insights_status="processing", agent_stage="starting")
+    events = [(0.0, copy.deepcopy(doc))]
+    progress = final.get("agent_progress") or []
+    jobfit_done = False
+    for i, entry in enumerate(progress):
+        t = duration * (i + 1) / (len(progress) + 1)
+        if not jobfit_done and t >= jobfit_at:
+            doc.update({f: final.get(f, STREAM_FIELDS[f]) for f in JOBFIT_FIELDS}, jobfit_status="processed")
+            events.append((jobfit_at, copy.deepcopy(doc)))
+            jobfit_done = True
+        doc["agent_progress"] = doc["agent_progress"] + [entry]
+        doc["agent_stage"] = entry.get("stage", "")
+        events.append((t, copy.deepcopy(doc)))
+    doc.update({f: final.get(f, STREAM_FIELDS[f]) for f in STREAM_FIELDS})
+    events.append((duration, copy.deepcopy(doc)))
+    return events
+
+
+def state_at(events: List[Tuple[float, Dict[str, Any]]], t: float) -> Dict[str, Any]:
+    current = events[0][1]
+    for when, doc in events:
+        if when > t:
+            break
+        current = doc
+    return current
+
+
+def bytes_before(events, poll_interval: float) -> Tuple[int, int]:
+    total = messages = 0
+    t = 0.0
+    while True:
+        doc = state_at(events, t)
+        total += len(f"data: {json.dumps({'_id': 'x' * 24, **doc})}\n\n")
+        messages += 1
+        if t >= events[-1][0]:
+            return total, messages
+        total += len("data: {}\n\n")
+        messages += 1
+        t += poll_interval
+
+
+def bytes_after(events) -> Tuple[int, int]:
+    total = messages = 0
+    sent: Dict[str, str] = {}
+    last_t = 0.0
+    for t, doc in events:
+        heartbeats = int((t - last_t) // HEARTBEAT_INTERVAL)
+        total += heartbeats * len(": heartbeat\n\n")
+        messages += heartbeats
+        delta, digests = _stream_delta(doc, sent)
+        if not sent:
+            delta["_id"] = "x" * 24
+        if delta:
+            total += len(f"id: {_event_id(digests)}\ndata: {json.dumps(delta)}\n\n")
+            messages += 1
+            sent = digests
+            last_t = t
+    return total, messages
+
+
+async def load_final(file_id: str) -> Optional[Dict[str, Any]]:
+    return await get_file_fields(file_id, STREAM_FIELDS)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="SSE bytes per job, before and after delta encoding.")
+    parser.add_argument("--file-id", help="Use this finished upload's document as the final state")
+    parser.add_argument("--duration", type=float, default=120, help="Job length in seconds")
+    parser.add_argument("--jobfit-at", type=float, default=30, help="When the job-fit result lands")
+    parser.add_argument("--poll-interval", type=float, default=2, help="Tick of the original generator")
+    args = parser.parse_args(argv)
+
+    final = synthetic_final()
+    if args.file_id:
+        final = asyncio.run(load_final(args.file_id))
+        if not final:
+            print(f"[Bench] file {args.file_id} not found")
+            return 1
+        final.pop("_id", None)
+
+    events = timeline(final, args.duration, args.jobfit_at)
+    before, before_msgs = bytes_before(events, args.poll_interval)
+    after, after_msgs = bytes_after(events)
+    print(f"[Bench] {len(events)} worker writes over {args.duration:.0f}s")
+    print(f"[Bench] before: {before} bytes in {before_msgs} messages")
+    print(f"[Bench] after:  {after} bytes in {after_msgs} messages ({after / max(before, 1):.1%} of before)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
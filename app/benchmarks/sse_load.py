@@ -0,0 +1,109 @@
+"""SSE load test: Mongo reads per connected /stream client, push vs polling.
+
+Run where the app's Mongo and Valkey are reachable (e.g. `docker compose exec app`), against a
+quiet deployment, once per server mode:
+
+    python -m app.benchmarks.sse_load --base-url http://localhost:8000 --clients 200 --duration 60
+    # restart the app with STREAM_PUSH_ENABLED=false, then run again
+
+A synthetic in-progress upload is inserted and updated every --update-interval seconds the way
+a worker would (write + publish_status); Mongo's serverStatus query counter gives the reads.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+import aiohttp
+from bson import ObjectId
+from ..db.collections.files import files_collection
+from ..queue.events import publish_status
+
+
+async def _query_count() -> int:
+    status = await files_collection.database.client.admin.command("serverStatus")
+    return status["opcounters"]["query"]
+
+
+async def _client(session: aiohttp.ClientSession, url: str, stop: asyncio.Event, stats: dict):
+    try:
+        async with session.get(url) as resp:
+            async for line in resp.content:
+                stats["bytes"] += len(line)
+                if line.startswith(b"data:"):
+                    stats["events"] += 1
+                if stop.is_set():
+                    break
+    except Exception as e:
+        stats["errors"] += 1
+        print(f"[Bench] client failed: {e}")
+
+
+async def _simulate_worker(file_id: str, interval: float, stop: asyncio.Event, stats: dict):
+    step = 0
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        step += 1
+        await files_collection.update_one(
+            {"_id": ObjectId(file_id)},
+            {"$set": {"agent_stage": f"step-{step}"},
+             "$push": {"agent_progress": {"stage": f"step-{step}", "status": "done", "items_count": step}}},
+        )
+        publish_status(file_id)
+        stats["updates"] += 1
+
+
+async def run(base_url: str, clients: int, duration: float, update_interval: float):
+    file_id = ObjectId()
+    await files_collection.insert_one({
+        "_id": file_id, "name": "sse-load-test", "status": "processing", "company_name": "Bench",
+        "job_description": "", "position": "", "jobfit_status": "processing", "insights_status": "processing",
+        "agent_progress": [], "created_at": datetime.now(timezone.utc),
+    })
+    stats = {"bytes": 0, "events": 0, "errors": 0, "updates": 0}
+    stop = asyncio.Event()
+    url = f"{base_url.rstrip('/')}/stream/{file_id}"
+    try:
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+        async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=0)) as session:
+            tasks = [asyncio.create_task(_client(session, url, stop, stats)) for _ in range(clients)]
+            # Let every client connect and read its snapshot before counting.
+            await asyncio.sleep(2)
+            before, started = await _query_count(), time.monotonic()
+            worker = asyncio.create_task(_simulate_worker(str(file_id), update_interval, stop, stats))
+            await asyncio.sleep(duration)
+            reads = await _query_count() - before
+            elapsed = time.monotonic() - started
+
+            stop.set()
+            worker.cancel()
+            # Terminal statuses end every stream.
+            await files_collection.update_one(
+                {"_id": file_id}, {"$set": {"jobfit_status": "processed", "insights_status": "processed"}}
+            )
+            publish_status(str(file_id))
+            await asyncio.wait(tasks, timeout=30)
+            for t in tasks:
+                t.cancel()
+    finally:
+        await files_collection.delete_one({"_id": file_id})
+
+    per_client_min = reads / max(clients, 1) / (elapsed / 60)
+    print(f"[Bench] {clients} clients for {elapsed:.0f}s, {stats['updates']} worker updates")
+    print(f"[Bench] Mongo reads: {reads} total, {per_client_min:.1f} per client per minute")
+    print(f"[Bench] received {stats['events']} events, {stats['bytes']} bytes, {stats['errors']} client errors")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Mongo reads per connected SSE client.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to measure")
+    parser.add_argument("--update-interval", type=float, default=5, help="Seconds between simulated worker writes")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.base_url, args.clients, args.duration, args.update_interval))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Upload memory benchmark: concurrent large uploads, whole-body read vs stream_to_disk.
+
+    python -m app.benchmarks.upload_memory --uploads 20 --size-mb 10
+
+Each mode runs a minimal FastAPI app under uvicorn in a fresh process with only the upload
+handler that matters: "original" is what /upload used to do (`await file.read()`, then
+save_to_disk), "current" is stream_to_disk. The parent posts --uploads multipart files at once
+and samples the server's RSS; reported is the peak above the idle baseline, plus wall time.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from typing import List, Optional, Tuple
+import aiohttp
+import psutil
+
+SAMPLE_INTERVAL_SECONDS = 0.01
+
+
+def _serve(mode: str, port: int, upload_dir: str):
+    import uvicorn
+    from fastapi import FastAPI, UploadFile
+    from ..utils.file import save_to_disk, stream_to_disk
+
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile):
+        path = os.path.join(upload_dir, uuid.uuid4().hex, file.filename)
+        if mode == "original":
+            await save_to_disk(await file.read(), path)
+        else:
+            await stream_to_disk(file, path, max_bytes=sys.maxsize)
+        return {"ok": True}
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def _wait_ready(session: aiohttp.ClientSession, base_url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(f"{base_url}/health") as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("benchmark server did not start")
+        await asyncio.sleep(0.1)
+
+
+async def _sample_peak(proc: psutil.Process, stop: asyncio.Event) -> int:
+    peak = 0
+    while not stop.is_set():
+        peak = max(peak, proc.memory_info().rss)
+        await asyncio.sleep(SAMPLE_INTERVAL_SECONDS)
+    return peak
+
+
+async def _post(session: aiohttp.ClientSession, url: str, payload_path: str):
+    with open(payload_path, "rb") as f:
+        form = aiohttp.FormData()
+        form.add_field("file", f, filename="resume.pdf", content_type="application/pdf")
+        async with session.post(url, data=form) as resp:
+            resp.raise_for_status()
+
+
+async def _load(pid: int, port: int, payload_path: str, uploads: int) -> Tuple[int, int, float]:
+    base_url = f"http://127.0.0.1:{port}"
+    server = psutil.Process(pid)
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=0)) as session:
+        await _wait_ready(session, base_url)
+        baseline = server.memory_info().rss
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(_sample_peak(server, stop))
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*[_post(session, f"{base_url}/upload", payload_path) for _ in range(uploads)])
+        finally:
+            elapsed = time.perf_counter() - start
+            stop.set()
+            peak = await sampler
+    return baseline, peak, elapsed
+
+
+def measure(mode: str, port: int, payload_path: str, uploads: int) -> Tuple[int, int, float]:
+    upload_dir = tempfile.mkdtemp()
+    ctx = multiprocessing.get_context("forkserver")
+    proc = ctx.Process(target=_serve, args=(mode, port, upload_dir), daemon=True)
+    proc.start()
+    try:
+        return asyncio.run(_load(proc.pid, port, payload_path, uploads))
+    finally:
+        proc.terminate()
+        proc.join()
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Server memory during concurrent large uploads.")
+    parser.add_argument("--uploads", type=int, default=20, help="Uploads in flight at once")
+    parser.add_argument("--size-mb", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=18500)
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        payload_path = os.path.join(tmp_dir, "payload.pdf")
+        with open(payload_path, "wb") as f:
+            f.write(os.urandom(int(args.size_mb * 1024 * 1024)))
+        for i, mode in enumerate(("original", "current")):
+            baseline, peak, elapsed = measure(mode, args.port + i, payload_path, args.uploads)
+            print(f"[Bench] {mode:8s} {args.uploads} x {args.size_mb:g} MB: {elapsed:6.2f}s  "
+                  f"idle RSS {baseline / 2**20:6.1f} MiB  peak RSS {peak / 2**20:6.1f} MiB  "
+                  f"(+{(peak - baseline) / 2**20:.1f} MiB)")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Offline URL ranking evaluation: replay recorded discovery results through the ranker.
+
+    DISCOVERY_RECORD_PATH=/tmp/discovery.jsonl   # on a worker, to record real searches
+    python -m app.benchmarks.url_ranking /tmp/discovery.jsonl --k 10 20 30
+
+For each k: URLs and distinct domains kept per search and an estimated research latency. When
+candidates are hand-labelled with "useful": true/false, precision and recall are reported too.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from ..queue.url_ranking import rank_urls, registered_domain, DISCOVERY_MAX_PER_DOMAIN
+
+
+def _load_records(path: str) -> Iterable[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Replay recorded discovery results through the URL ranker.")
+    parser.add_argument("records", help="JSON lines written via DISCOVERY_RECORD_PATH")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 20, 30])
+    parser.add_argument("--max-per-domain", type=int, default=DISCOVERY_MAX_PER_DOMAIN)
+    parser.add_argument("--seconds-per-doc", type=float, default=4.0,
+                        help="Measured fetch + summary latency per document, for the latency estimate")
+    parser.add_argument("--concurrency", type=int, default=6, help="Summaries in flight (MAX_SUMMARY_CONCURRENCY)")
+    args = parser.parse_args(argv)
+
+    records = list(_load_records(args.records))
+    print(f"[Bench] {len(records)} recorded searches")
+    for k in args.k:
+        kept = judged = labelled = found = 0
+        domains = 0
+        for rec in records:
+            urls = rank_urls(rec["candidates"], rec["company"], rec["query"], rec["num_queries"],
+                             rec["max_per_query"], k, args.max_per_domain)
+            kept += len(urls)
+            domains += len({registered_domain(u) for u in urls})
+            # Candidates may be hand-labelled with "useful": true/false to measure answer quality.
+            labels = {c["url"]: c["useful"] for c in rec["candidates"] if "useful" in c}
+            labelled += sum(labels.values())
+            found += sum(1 for u in urls if labels.get(u))
+            judged += sum(1 for u in urls if u in labels)
+        n = max(len(records), 1)
+        per_search = kept / n
+        # Summaries run `concurrency` at a time, so latency grows in steps of that many documents.
+        latency = np.ceil(per_search / args.concurrency) * args.seconds_per_doc
+        line = f"[Bench] k={k}: {per_search:.1f} urls, {domains / n:.1f} domains, ~{latency:.0f}s per search"
+        if labelled:
+            line += f", precision {found / max(judged, 1):.2f}, recall {found / labelled:.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Vision request size and latency against resume page count.
+
+    python -m app.benchmarks.vision_request --pages 1 2 4 8
+    python -m app.benchmarks.vision_request resume.pdf --pages 1 2 4 --live   # also call the model
+
+For each page count the resume is rendered under VISION_MAX_REQUEST_BYTES and packed into one
+multimodal message, as process_file does. Reported: render time and request JSON bytes; with
+--live, the latency of that single call and of the per-page split mode (VISION_SPLIT_PAGES).
+Needs poppler-utils; --live needs the provider API keys.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Optional
+from ..queue.ingest import VISION_MAX_REQUEST_BYTES
+from ..queue.worker_analyser import build_vision_messages
+from ..utils.pdf import render_pages_b64
+from .pdf_render import synthetic_pdf
+
+PROMPT = "Give me a detailed overall recommendation and precise match score of image(s) of CV/Resume."
+MODEL = "gemini-2.5-flash"
+
+
+async def call_latency(pages_b64: List[str]) -> tuple:
+    from app.llm_module.llm_caller import get_default_llm_caller
+    llm_caller = get_default_llm_caller()
+    start = time.perf_counter()
+    await llm_caller.allm_call(MODEL, build_vision_messages(PROMPT, pages_b64), use_cache=False)
+    single = time.perf_counter() - start
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        llm_caller.allm_call(MODEL, build_vision_messages(PROMPT, [page]), use_cache=False) for page in pages_b64
+    ])
+    return single, time.perf_counter() - start
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Vision request size and latency by page count.")
+    parser.add_argument("pdf", nargs="?", help="Resume PDF; a scanned-style synthetic one otherwise")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--budget", type=int, default=VISION_MAX_REQUEST_BYTES, help="Base64 bytes per request")
+    parser.add_argument("--live", action="store_true", help="Time real single and split model calls")
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        path = args.pdf
+        if not path:
+            path = os.path.join(tmp_dir, "synthetic.pdf")
+            synthetic_pdf(path, max(args.pages))
+        for n in args.pages:
+            start = time.perf_counter()
+            pages_b64 = render_pages_b64(path, n, max_total_bytes=args.budget)
+            render = time.perf_counter() - start
+            request_bytes = len(json.dumps(build_vision_messages(PROMPT, pages_b64)))
+            line = (f"[Bench] {len(pages_b64)} page(s): render {render * 1000:6.0f} ms, "
+                    f"request {request_bytes / 1024:8.1f} KiB (budget {args.budget / 1024:.0f} KiB)")
+            if args.live:
+                single, split = asyncio.run(call_latency(pages_b64))
+                line += f", one call {single:5.1f}s, split {split:5.1f}s"
+            print(line)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
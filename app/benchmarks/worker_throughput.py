@@ -0,0 +1,90 @@
+"""Worker throughput benchmark: `rq worker` vs AsyncWorker on I/O-bound async jobs.
+
+    python -m app.benchmarks.worker_throughput --jobs 100 --seconds 0.5 --concurrency 8
+
+Run where Valkey is reachable (e.g. `docker compose exec worker`). Each job awaits
+asyncio.sleep(--seconds), standing in for a research job that is mostly waiting on search, fetch
+and LLM calls. The same batch is drained by --rq-workers `rq worker --burst` processes, then by
+one AsyncWorker at --concurrency. Reported: wall time, jobs/s and jobs that did not finish.
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+import uuid
+from typing import List, Optional, Tuple
+from rq import Queue
+from ..queue.q import redis_connection
+from ..queue.async_worker import AsyncWorker
+
+REDIS_URL = "redis://valkey:6379"
+# By import path: under `python -m` this module is __main__, which the workers cannot import.
+JOB_FUNC = "app.benchmarks.worker_throughput.simulated_job"
+
+
+async def simulated_job(seconds: float) -> float:
+    await asyncio.sleep(seconds)
+    return seconds
+
+
+def _enqueue(queue: Queue, jobs: int, seconds: float) -> List[str]:
+    return [queue.enqueue(JOB_FUNC, seconds).id for _ in range(jobs)]
+
+
+def _unfinished(queue: Queue, job_ids: List[str]) -> int:
+    finished = set(queue.finished_job_registry.get_job_ids())
+    return sum(1 for job_id in job_ids if job_id not in finished)
+
+
+def run_rq(queue: Queue, jobs: int, seconds: float, workers: int) -> Tuple[float, int]:
+    job_ids = _enqueue(queue, jobs, seconds)
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen(["rq", "worker", "--burst", "--quiet", "--url", REDIS_URL, queue.name])
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.wait()
+    elapsed = time.perf_counter() - start
+    return elapsed, _unfinished(queue, job_ids)
+
+
+async def run_async(queue: Queue, jobs: int, seconds: float, concurrency: int) -> Tuple[float, int]:
+    job_ids = _enqueue(queue, jobs, seconds)
+    worker = AsyncWorker([queue.name], concurrency)
+    start = time.perf_counter()
+    task = asyncio.create_task(worker.run())
+    # AsyncWorker has no burst mode: stop it once the batch is through.
+    while _unfinished(queue, job_ids) and not task.done():
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    worker.request_stop()
+    await task
+    return elapsed, _unfinished(queue, job_ids)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Jobs per second for rq worker and AsyncWorker.")
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=0.5, help="Simulated I/O wait per job")
+    parser.add_argument("--rq-workers", type=int, default=1, help="`rq worker --burst` processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="AsyncWorker concurrency")
+    args = parser.parse_args(argv)
+
+    queue = Queue(f"bench-throughput-{uuid.uuid4().hex[:8]}", connection=redis_connection)
+    try:
+        for mode, measure in (
+            (f"rq worker x{args.rq_workers}", lambda: run_rq(queue, args.jobs, args.seconds, args.rq_workers)),
+            (f"async x{args.concurrency}", lambda: asyncio.run(
+                run_async(queue, args.jobs, args.seconds, args.concurrency))),
+        ):
+            elapsed, unfinished = measure()
+            print(f"[Bench] {mode:14s} {args.jobs} jobs in {elapsed:6.2f}s  "
+                  f"{args.jobs / elapsed:6.1f} jobs/s  unfinished {unfinished}")
+    finally:
+        queue.delete(delete_jobs=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
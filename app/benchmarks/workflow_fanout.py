@@ -0,0 +1,76 @@
+"""Wall-clock time of resume_workflow against a fake LLMCaller with fixed latency.
+
+    python -m app.benchmarks.workflow_fanout --latency 1.0
+
+Runs the fan-out graph and, for comparison, the same four nodes chained one after another.
+With the fan-out the total should be close to one node's latency rather than four.
+"""
+import argparse
+import json
+import sys
+import time
+from types import SimpleNamespace
+from typing import List, Optional
+from langgraph.graph import StateGraph, START, END
+from app.agents import workflow as workflow_module
+from app.agents.state import ResumeAnalysisState
+
+NODES = ("job_fit", "interview_prep", "company_insights", "web_research")
+
+
+class FakeLLMCaller:
+    """Stands in for LLMCaller: sleeps for `latency` and returns an empty JSON completion."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def llm_call(self, llm_name: str, messages: list, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        message = SimpleNamespace(content=json.dumps({}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def sequential_workflow():
+    graph = StateGraph(ResumeAnalysisState)
+    for node in NODES:
+        graph.add_node(node, getattr(workflow_module, f"{node}_node"))
+    graph.add_edge(START, NODES[0])
+    for a, b in zip(NODES, NODES[1:]):
+        graph.add_edge(a, b)
+    graph.add_edge(NODES[-1], END)
+    return graph.compile()
+
+
+def time_graph(graph, runs: int) -> float:
+    state = ResumeAnalysisState(
+        resume_text="resume", job_description="jd", company_name="Acme", position="SWE", current_step="starting"
+    )
+    start = time.perf_counter()
+    for _ in range(runs):
+        final = graph.invoke(state)
+    elapsed = (time.perf_counter() - start) / runs
+    assert sorted(final["completed_steps"]) == sorted(NODES), final["completed_steps"]
+    return elapsed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Fan-out vs sequential resume workflow with a fake LLM.")
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per fake LLM call")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    fake = FakeLLMCaller(args.latency)
+    # The nodes look the caller up on the module at call time.
+    workflow_module.llm_caller = fake
+
+    sequential = time_graph(sequential_workflow(), args.runs)
+    fanout = time_graph(workflow_module.resume_workflow, args.runs)
+    print(f"[Bench] {fake.calls} fake LLM calls at {args.latency:.2f}s each")
+    print(f"[Bench] sequential: {sequential:.2f}s per run")
+    print(f"[Bench] fan-out:    {fanout:.2f}s per run ({sequential / fanout:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
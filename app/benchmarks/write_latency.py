@@ -0,0 +1,162 @@
+"""Write benchmarks: /upload's document writes and the agent's progress writes, before and after.
+
+    python -m app.benchmarks.write_latency --uploads 5 --reports 200 --interval 0.01 --upload-requests 200
+
+Needs MONGO_URL. The synthetic documents are removed afterwards.
+
+/upload: the Mongo writes one upload request makes, --upload-requests times in sequence.
+"insert+2 updates" is what the handler used to do (insert, set the statuses, set "queued" after
+enqueuing); "insert_one" is the complete document inserted once. The rest of the handler is the
+same in both, so the difference is the change in request latency.
+
+Progress: a research run reporting to --uploads documents every --interval seconds. "direct"
+awaits update_one per document per report, as the agent worker used to; "coalesced" goes through
+WriteCoalescer. Reported per mode: wall time, round trips to Mongo, time the reporting code is
+blocked per report, and write latency (report call until the change is in Mongo).
+All latencies are mean / p95 / max.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+import numpy as np
+from bson import ObjectId
+from ..db.batching import WriteCoalescer
+from ..db.collections.files import files_collection
+
+
+class _TimedCollection:
+    """Forwards bulk_write to the real collection, counting round trips and timing queued reports.
+
+    The coalescer swaps out its buffer right before calling bulk_write, so the reports queued at
+    that moment are exactly the ones this write carries.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.round_trips = 0
+        self.queued: List[float] = []
+        self.latency: List[float] = []
+
+    async def bulk_write(self, requests, ordered: bool = True):
+        self.round_trips += 1
+        batch, self.queued = self.queued, []
+        result = await self.collection.bulk_write(requests, ordered=ordered)
+        now = time.perf_counter()
+        self.latency.extend(now - t for t in batch)
+        return result
+
+
+def _entry(step: int) -> dict:
+    return {"stage": f"step-{step}", "status": "done", "items_count": step}
+
+
+async def run_direct(ids: List[ObjectId], reports: int, interval: float) -> dict:
+    blocked, latency = [], []
+    start = time.perf_counter()
+    for step in range(reports):
+        began = time.perf_counter()
+        for _id in ids:
+            await files_collection.update_one(
+                {"_id": _id}, {"$set": {"agent_stage": f"step-{step}"}, "$push": {"agent_progress": _entry(step)}}
+            )
+        done = time.perf_counter()
+        blocked.append(done - began)
+        latency.append(done - began)
+        await asyncio.sleep(interval)
+    return {"wall": time.perf_counter() - start, "round_trips": reports * len(ids),
+            "blocked": blocked, "latency": latency}
+
+
+async def run_coalesced(ids: List[ObjectId], reports: int, interval: float) -> dict:
+    collection = _TimedCollection(files_collection)
+    blocked = []
+    start = time.perf_counter()
+    async with WriteCoalescer(collection) as progress:
+        for step in range(reports):
+            began = time.perf_counter()
+            for _id in ids:
+                progress.set(_id, {"agent_stage": f"step-{step}"})
+                progress.push(_id, "agent_progress", _entry(step))
+            collection.queued.append(began)
+            blocked.append(time.perf_counter() - began)
+            await asyncio.sleep(interval)
+    return {"wall": time.perf_counter() - start, "round_trips": collection.round_trips,
+            "blocked": blocked, "latency": collection.latency}
+
+
+def _upload_doc() -> dict:
+    return {"name": "write-latency-bench.pdf", "status": "saving", "company_name": "Bench",
+            "job_description": "", "position": "", "created_at": datetime.now(timezone.utc)}
+
+
+async def upload_three_writes() -> ObjectId:
+    result = await files_collection.insert_one(_upload_doc())
+    _id = result.inserted_id
+    await files_collection.update_one(
+        {"_id": _id}, {"$set": {"jobfit_status": "queued", "insights_status": "queued", "agent_progress": []}}
+    )
+    await files_collection.update_one(
+        {"_id": _id}, {"$set": {"status": "queued", "jobfit_status": "queued", "insights_status": "queued"}}
+    )
+    return _id
+
+
+async def upload_single_insert() -> ObjectId:
+    doc = _upload_doc()
+    doc.update(_id=ObjectId(), status="queued", jobfit_status="queued", insights_status="queued", agent_progress=[])
+    result = await files_collection.insert_one(doc)
+    return result.inserted_id
+
+
+async def run_uploads(requests: int):
+    for mode, fn in (("insert+2 updates", upload_three_writes), ("insert_one", upload_single_insert)):
+        ids, latency = [], []
+        try:
+            for _ in range(requests):
+                began = time.perf_counter()
+                ids.append(await fn())
+                latency.append(time.perf_counter() - began)
+        finally:
+            await files_collection.delete_many({"_id": {"$in": ids}})
+        print(f"[Bench] /upload {mode:16s} {requests} requests  latency {_ms(latency)}")
+
+
+def _ms(values: List[float]) -> str:
+    arr = np.array(values) * 1000
+    return f"{arr.mean():7.2f} / {np.percentile(arr, 95):7.2f} / {arr.max():7.2f} ms"
+
+
+async def run(uploads: int, reports: int, interval: float, upload_requests: int):
+    if upload_requests:
+        await run_uploads(upload_requests)
+    ids = [ObjectId() for _ in range(uploads)]
+    await files_collection.insert_many([
+        {"_id": _id, "name": "write-latency-bench", "status": "processing", "agent_progress": [],
+         "created_at": datetime.now(timezone.utc)}
+        for _id in ids
+    ])
+    try:
+        for mode, fn in (("direct", run_direct), ("coalesced", run_coalesced)):
+            await files_collection.update_many({"_id": {"$in": ids}}, {"$set": {"agent_progress": []}})
+            stats = await fn(ids, reports, interval)
+            print(f"[Bench] {mode:9s} wall {stats['wall']:6.2f}s  round trips {stats['round_trips']:5d}  "
+                  f"blocked {_ms(stats['blocked'])}  write latency {_ms(stats['latency'])}")
+    finally:
+        await files_collection.delete_many({"_id": {"$in": ids}})
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Latency of /upload writes and of agent progress writes.")
+    parser.add_argument("--uploads", type=int, default=5, help="Documents updated per report")
+    parser.add_argument("--reports", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between reports")
+    parser.add_argument("--upload-requests", type=int, default=200, help="/upload write sequences; 0 skips them")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.uploads, args.reports, args.interval, args.upload_requests))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import asyncio
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from pymongo import UpdateOne
+from pymongo.asynchronous.collection import AsyncCollection
+
+# Frequent status/progress writes are merged per document and sent in one bulk_write.
+FLUSH_INTERVAL_SECONDS = 0.25
+MAX_PENDING_DOCS = 100
+
+
+class WriteCoalescer:
+    """Buffer $set / $push updates per _id and flush them with bulk_write on a short interval.
+
+    Later $set values for the same field win; $push values are appended in call order.
+    `on_flush` is called with the _ids written, e.g. to publish status changes. Background flush
+    errors are logged, not raised: progress writes are best effort and must not fail the caller.
+    """
+
+    def __init__(self, collection: AsyncCollection, flush_interval: float = FLUSH_INTERVAL_SECONDS,
+                 max_pending: int = MAX_PENDING_DOCS,
+                 on_flush: Optional[Callable[[Iterable[Any]], None]] = None):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self._pending: Dict[Any, Dict[str, Dict[str, Any]]] = {}
+        self._timer: Optional[asyncio.Task] = None
+        # Background flushes are referenced here so they are not garbage collected mid-write.
+        self._tasks: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+
+    def set(self, _id: Any, fields: Dict[str, Any]):
+        self._pending.setdefault(_id, {}).setdefault("$set", {}).update(fields)
+        self._schedule()
+
+    def push(self, _id: Any, field: str, value: Any):
+        pushes = self._pending.setdefault(_id, {}).setdefault("$push", {})
+        pushes.setdefault(field, {"$each": []})["$each"].append(value)
+        self._schedule()
+
+    def _schedule(self):
+        if len(self._pending) >= self.max_pending:
+            self._spawn(self._flush_logged())
+        elif self._timer is None or self._timer.done():
+            self._timer = self._spawn(self._flush_logged(self.flush_interval))
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_logged(self, delay: float = 0):
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"[WriteCoalescer] flush failed: {e}")
+
+    async def flush(self):
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            await self.collection.bulk_write(
+                [UpdateOne({"_id": _id}, ops) for _id, ops in pending.items()],
+                ordered=False,
+            )
+        if self.on_flush:
+            self.on_flush(pending.keys())
+
+    async def aclose(self):
+        # Flush first: the lock makes this wait for any flush already started, so what is
+        # left in _tasks is only sleeping timers or flushes that would find nothing pending.
+        await self._flush_logged()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def __aenter__(self) -> "WriteCoalescer":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -1,5 +1,9 @@
-from typing import TypedDict, Optional
+import os
+from datetime import datetime
+from typing import TypedDict, Optional, Dict, Any, Iterable
+from bson import ObjectId
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pymongo.asynchronous.collection import AsyncCollection
 from ..db import database
 
@@ -7,9 +11,55 @@ class FileSchema(TypedDict):
     name: str = Field(..., description="Name of the file")
     status: str = Field(..., description="Status of the file")
     result: Optional[str] = Field(None, decription="Result from AI")
+    company_name: str = Field(..., description="Company applied to")
+    job_description: str = Field(..., description="Job description text")
+    position: str = Field("", description="Position applied for")
+    jobfit_status: str = Field("queued", description="Status of the job-fit analysis")
+    insights_status: str = Field("queued", description="Status of the company research agent")
+    resume_hash: Optional[str] = Field(None, description="Id of the ingested resume artifact")
+    submission_hash: Optional[str] = Field(None, description="Deduplication key of the submission")
+    linked_to: Optional[str] = Field(None, description="file_id of the job this duplicate follows")
+    created_at: datetime = Field(..., description="Upload time, drives the TTL index")
 
 COLLECTION_NAME = "files"
 
+# Documents are removed this long after upload by Mongo's TTL monitor.
+FILES_TTL_SECONDS = int(os.getenv("FILES_TTL_SECONDS", str(30 * 24 * 3600)))
+
+FILES_INDEXES = [
+    IndexModel([("jobfit_status", ASCENDING), ("insights_status", ASCENDING)], name="statuses"),
+    IndexModel([("submission_hash", ASCENDING), ("created_at", DESCENDING)], name="submission_hash_recent"),
+    IndexModel([("resume_hash", ASCENDING)], name="resume_hash"),
+    IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=FILES_TTL_SECONDS),
+]
+
+# Projections for the readers that only need part of a document.
+JOB_DETAILS_FIELDS = ("company_name", "job_description", "position")
+
 files_collection: AsyncCollection = database[COLLECTION_NAME]
 
 
+async def ensure_files_indexes():
+    await files_collection.create_indexes(FILES_INDEXES)
+
+
+def _projection(fields: Iterable[str]) -> Dict[str, int]:
+    return {field: 1 for field in fields}
+
+
+async def get_file_fields(file_id: str, fields: Iterable[str]) -> Optional[Dict[str, Any]]:
+    return await files_collection.find_one({"_id": ObjectId(file_id)}, _projection(fields))
+
+
+async def get_job_details(file_id: str) -> Optional[Dict[str, Any]]:
+    """company_name / job_description / position, without the (large) result fields."""
+    return await get_file_fields(file_id, JOB_DETAILS_FIELDS)
+
+
+async def get_linked_to(file_id: str) -> Optional[str]:
+    doc = await get_file_fields(file_id, ("linked_to",))
+    return (doc or {}).get("linked_to")
+
+
+async def set_file_fields(file_id: str, fields: Dict[str, Any]):
+    await files_collection.update_one({"_id": ObjectId(file_id)}, {"$set": fields})
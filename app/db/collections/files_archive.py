@@ -0,0 +1,25 @@
+import os
+from pymongo import ASCENDING, IndexModel
+from pymongo.asynchronous.collection import AsyncCollection
+from ..db import database
+
+COLLECTION_NAME = "files_archive"
+
+# Compact copies of old results, kept this long after archiving.
+ARCHIVE_TTL_SECONDS = int(os.getenv("ARCHIVE_TTL_SECONDS", str(365 * 24 * 3600)))
+
+# Only these fields survive archiving; the large agent output and JD are dropped.
+ARCHIVE_FIELDS = (
+    "name", "company_name", "position", "status", "jobfit_status", "insights_status",
+    "score", "result", "submission_hash", "resume_hash", "created_at",
+)
+
+ARCHIVE_INDEXES = [
+    IndexModel([("archived_at", ASCENDING)], name="archived_at_ttl", expireAfterSeconds=ARCHIVE_TTL_SECONDS),
+]
+
+files_archive_collection: AsyncCollection = database[COLLECTION_NAME]
+
+
+async def ensure_archive_indexes():
+    await files_archive_collection.create_indexes(ARCHIVE_INDEXES)
@@ -0,0 +1,17 @@
+from typing import TypedDict, Optional
+from pydantic import Field
+from pymongo.asynchronous.collection import AsyncCollection
+from ..db import database
+
+class PageSchema(TypedDict):
+    url: str = Field(..., description="URL the page was fetched from")
+    title: str = Field("", description="Extracted <title>")
+    text: str = Field("", description="Text extracted by trafilatura")
+    etag: Optional[str] = Field(None, description="ETag returned by the server")
+    last_modified: Optional[str] = Field(None, description="Last-Modified returned by the server")
+    fetched_at: float = Field(..., description="When the page was last fetched or revalidated")
+    last_used_at: float = Field(..., description="When the page was last served from cache")
+
+COLLECTION_NAME = "pages"
+
+pages_collection: AsyncCollection = database[COLLECTION_NAME]
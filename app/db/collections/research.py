@@ -0,0 +1,19 @@
+from typing import TypedDict, Optional, List
+from pydantic import Field
+from pymongo.asynchronous.collection import AsyncCollection
+from ..db import database
+
+class ResearchSchema(TypedDict):
+    key: str = Field(..., description="Normalized company|role key")
+    company: str = Field(..., description="Company name as first submitted")
+    role: str = Field(..., description="Position as first submitted")
+    status: str = Field(..., description="running, ready or failed")
+    owner: Optional[str] = Field(None, description="file_id (or 'warm') of the job running the pipeline")
+    lease_expires_at: float = Field(..., description="When a running owner is presumed dead")
+    waiters: List[str] = Field([], description="file_ids waiting for the running pipeline")
+    result: Optional[dict] = Field(None, description="company_insights / interview_prep / web_research")
+    completed_at: Optional[float] = Field(None, description="When the result was stored")
+
+COLLECTION_NAME = "research"
+
+research_collection: AsyncCollection = database[COLLECTION_NAME]
@@ -0,0 +1,15 @@
+from typing import TypedDict, List
+from pydantic import Field
+from pymongo.asynchronous.collection import AsyncCollection
+from ..db import database
+
+class ResumeArtifactSchema(TypedDict):
+    _id: str = Field(..., description="SHA-256 of the uploaded bytes or normalized resume text")
+    source: str = Field(..., description="text_input, text_layer or vision")
+    text: str = Field("", description="Resume text, empty for scans until extracted")
+    pages_b64: List[str] = Field([], description="Base64 JPEG page images for scanned PDFs")
+    created_at: float = Field(..., description="When the artifact was ingested")
+
+COLLECTION_NAME = "resumes"
+
+resumes_collection: AsyncCollection = database[COLLECTION_NAME]
@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from openai.types.chat import ChatCompletion
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from .loops import close_on_loop
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Empty disables the shared tier and keeps the cache in-process only.
+CACHE_REDIS_URL = os.getenv("LLM_CACHE_REDIS_URL", "redis://valkey:6379")
+CACHE_KEY_PREFIX = "llm-cache:"
+# Hit/miss counters shared by every process; GET /metrics reports all "metrics:*" hashes.
+CACHE_METRICS_KEY = "metrics:llm_cache"
+
+
+def cache_key(model: str, messages: List[dict]) -> str:
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier completion cache: an in-process LRU bounded by bytes, backed by Valkey.
+
+    Entries are stored as serialized ChatCompletion JSON so both tiers hold the same
+    payload and callers get back the object type they would get from the client.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, default_ttl: int = CACHE_TTL_SECONDS,
+                 redis_url: Optional[str] = CACHE_REDIS_URL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._redis: Optional[Redis] = Redis.from_url(redis_url) if redis_url else None
+        self._redis_url = redis_url
+        self._async_redis: Optional[AsyncRedis] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    def _get_async_redis(self) -> Optional[AsyncRedis]:
+        # Async connections belong to the loop that opened them; RQ jobs each run in a new loop.
+        if not self._redis_url:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            if self._async_redis is not None:
+                close_on_loop(self._async_loop, self._async_redis.aclose())
+            self._async_loop = loop
+            self._async_redis = AsyncRedis.from_url(self._redis_url)
+        return self._async_redis
+
+    # ---- in-process tier ----
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def _memory_set(self, key: str, payload: str, ttl: int):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time() + ttl, payload)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.counters["evictions"] += 1
+
+    def _drop(self, key: str):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _count_local(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _count(self, counter: str):
+        self._count_local(counter)
+        if self._redis is not None:
+            try:
+                self._redis.hincrby(CACHE_METRICS_KEY, counter, 1)
+            except Exception as e:
+                logger.warning(f"LLM cache counter update failed: {e}")
+
+    async def _acount(self, counter: str):
+        # The sync client would block the loop (and every other job on it) for a round trip.
+        self._count_local(counter)
+        async_redis = self._get_async_redis()
+        if async_redis is not None:
+            try:
+                await async_redis.hincrby(CACHE_METRICS_KEY, counter, 1)
+            except Exception as e:
+                logger.warning(f"LLM cache counter update failed: {e}")
+
+    # ---- public API ----
+    def get(self, key: str) -> Optional[ChatCompletion]:
+        payload = self._memory_get(key)
+        if payload is not None:
+            self._count("memory_hits")
+            return ChatCompletion.model_validate_json(payload)
+
+        if self._redis is not None:
+            try:
+                shared = self._redis.get(CACHE_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"LLM cache shared tier get failed: {e}")
+                shared = None
+            if shared is not None:
+                payload = shared.decode("utf-8")
+                ttl = self._shared_ttl(key)
+                self._memory_set(key, payload, ttl)
+                self._count("shared_hits")
+                return ChatCompletion.model_validate_json(payload)
+
+        self._count("misses")
+        return None
+
+    def set(self, key: str, response: ChatCompletion, ttl: Optional[int] = None):
+        ttl = ttl or self.default_ttl
+        payload = response.model_dump_json()
+        self._memory_set(key, payload, ttl)
+        if self._redis is not None:
+            try:
+                self._redis.set(CACHE_KEY_PREFIX + key, payload, ex=ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache shared tier set failed: {e}")
+
+    async def aget(self, key: str) -> Optional[ChatCompletion]:
+        payload = self._memory_get(key)
+        if payload is not None:
+            await self._acount("memory_hits")
+            return ChatCompletion.model_validate_json(payload)
+
+        async_redis = self._get_async_redis()
+        if async_redis is not None:
+            try:
+                shared = await async_redis.get(CACHE_KEY_PREFIX + key)
+                ttl = await async_redis.ttl(CACHE_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"LLM cache shared tier get failed: {e}")
+                shared = None
+            if shared is not None:
+                payload = shared.decode("utf-8")
+                self._memory_set(key, payload, ttl if ttl and ttl > 0 else self.default_ttl)
+                await self._acount("shared_hits")
+                return ChatCompletion.model_validate_json(payload)
+
+        await self._acount("misses")
+        return None
+
+    async def aset(self, key: str, response: ChatCompletion, ttl: Optional[int] = None):
+        ttl = ttl or self.default_ttl
+        payload = response.model_dump_json()
+        self._memory_set(key, payload, ttl)
+        async_redis = self._get_async_redis()
+        if async_redis is not None:
+            try:
+                await async_redis.set(CACHE_KEY_PREFIX + key, payload, ex=ttl)
+            except Exception as e:
+                logger.warning(f"LLM cache shared tier set failed: {e}")
+
+    def _shared_ttl(self, key: str) -> int:
+        try:
+            ttl = self._redis.ttl(CACHE_KEY_PREFIX + key)
+        except Exception:
+            ttl = None
+        return ttl if ttl and ttl > 0 else self.default_ttl
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_default_cache: Optional[LLMResponseCache] = None
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache shared by every LLMCaller, or None when disabled."""
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    if _default_cache is None:
+        _default_cache = LLMResponseCache()
+    return _default_cache
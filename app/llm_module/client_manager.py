@@ -1,8 +1,11 @@
+import asyncio
 import os
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from langsmith.wrappers import wrap_openai
-from typing import Dict
+from typing import Dict, Optional, Tuple
 from .models import AVAILABLE_LLMS, LLM
+from .loops import close_on_loop
 import logging
 from dotenv import load_dotenv
 
@@ -10,10 +13,19 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Connection pool shared by every async client of one provider.
+ASYNC_MAX_CONNECTIONS = int(os.getenv("LLM_ASYNC_MAX_CONNECTIONS", "50"))
+ASYNC_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_ASYNC_MAX_KEEPALIVE_CONNECTIONS", "20"))
+ASYNC_TIMEOUT_SECONDS = float(os.getenv("LLM_ASYNC_TIMEOUT_SECONDS", "120"))
+
 
 class LLMClientManager:
     def __init__(self):
         self.clients: Dict[str, OpenAI] = {}
+        self.async_clients: Dict[str, AsyncOpenAI] = {}
+        self._client_configs: Dict[str, Tuple[str, str, str]] = {}
+        self._http_clients: Dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._create_clients()
 
     def _create_clients(self):
@@ -40,6 +52,62 @@ class LLMClientManager:
             client = OpenAI(api_key=api_key, base_url=base_url)
             wrapped_client = wrap_openai(client)
             self.clients[llm_name] = wrapped_client
+            self._client_configs[llm_name] = (llm.provider, api_key, base_url)
+
+    def _reset_async_clients_if_loop_changed(self):
+        # Pooled connections belong to the loop that opened them. RQ runs every
+        # job in a fresh loop, so the pools are rebuilt when the loop changes.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._http_clients:
+                close_on_loop(self._loop, self._close_http_clients(list(self._http_clients.values())))
+            self._loop = loop
+            self._http_clients = {}
+            self.async_clients = {}
+
+    @staticmethod
+    async def _close_http_clients(http_clients):
+        for http_client in http_clients:
+            try:
+                await http_client.aclose()
+            except Exception as e:
+                logger.warning(f"Closing LLM http client failed: {e}")
+
+    def _get_http_client(self, provider: str) -> httpx.AsyncClient:
+        if provider not in self._http_clients:
+            self._http_clients[provider] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=ASYNC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ASYNC_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+                timeout=ASYNC_TIMEOUT_SECONDS,
+            )
+        return self._http_clients[provider]
 
     def get_client(self, llm_name: str) -> OpenAI:
         return self.clients.get(llm_name)
+
+    def get_async_client(self, llm_name: str) -> Optional[AsyncOpenAI]:
+        """Return an AsyncOpenAI client sharing one connection pool per provider.
+
+        Must be called from a running event loop.
+        """
+        self._reset_async_clients_if_loop_changed()
+        if llm_name not in self.async_clients:
+            config = self._client_configs.get(llm_name)
+            if config is None:
+                return None
+            provider, api_key, base_url = config
+            async_client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=self._get_http_client(provider),
+            )
+            self.async_clients[llm_name] = wrap_openai(async_client)
+        return self.async_clients[llm_name]
+
+    async def aclose(self):
+        for http_client in self._http_clients.values():
+            await http_client.aclose()
+        self._http_clients = {}
+        self.async_clients = {}
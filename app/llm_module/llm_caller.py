@@ -1,14 +1,22 @@
-from typing import List
+from typing import List, Optional
 from .models import AVAILABLE_LLMS
 from .client_manager import LLMClientManager
+from .cache import LLMResponseCache, cache_key, get_default_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class LLMCaller:
-    def __init__(self, client_manager: LLMClientManager):
+    def __init__(self, client_manager: LLMClientManager, cache: Optional[LLMResponseCache] = None):
         self.client_manager = client_manager
+        self.cache = cache if cache is not None else get_default_cache()
+
+    def _cache_key(self, llm_name: str, messages: List[dict], use_cache: bool) -> Optional[str]:
+        if not use_cache or self.cache is None:
+            return None
+        llm = AVAILABLE_LLMS.get(llm_name)
+        return cache_key(llm.model if llm else llm_name, messages)
 
     def _get_fallback_chain(self, llm_name: str) -> List[str]:
         chain = []
@@ -21,7 +29,18 @@ class LLMCaller:
             current = llm.fallback_to
         return chain
 
-    def llm_call(self, llm_name: str, messages: List[dict]):
+    def llm_call(self, llm_name: str, messages: List[dict], cache_ttl: Optional[int] = None, use_cache: bool = True):
+        key = self._cache_key(llm_name, messages, use_cache)
+        if key:
+            try:
+                cached = self.cache.get(key)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                logger.info(f"LLM cache hit for '{llm_name}'")
+                return cached
+
         chain = self._get_fallback_chain(llm_name)
         last_exception = None
 
@@ -37,6 +56,12 @@ class LLMCaller:
                     model=AVAILABLE_LLMS[name].model,
                     messages=messages,
                 )
+                # A fallback model's answer is not what the key (the requested model) names.
+                if key and name == llm_name:
+                    try:
+                        self.cache.set(key, response, cache_ttl)
+                    except Exception as e:
+                        logger.warning(f"LLM cache store failed: {e}")
                 return response
             except Exception as e:
                 logger.warning(f"LLM '{name}' call failed: {e}")
@@ -44,3 +69,55 @@ class LLMCaller:
 
         raise Exception(
             f"All LLM calls failed in fallback chain {chain}") from last_exception
+
+    async def allm_call(self, llm_name: str, messages: List[dict], cache_ttl: Optional[int] = None, use_cache: bool = True):
+        key = self._cache_key(llm_name, messages, use_cache)
+        if key:
+            try:
+                cached = await self.cache.aget(key)
+            except Exception as e:
+                logger.warning(f"LLM cache lookup failed: {e}")
+                cached = None
+            if cached is not None:
+                logger.info(f"LLM cache hit for '{llm_name}'")
+                return cached
+
+        chain = self._get_fallback_chain(llm_name)
+        last_exception = None
+
+        for name in chain:
+            client = self.client_manager.get_async_client(name)
+            if client is None:
+                logger.warning(f"Async client for LLM '{name}' not found, skipping.")
+                continue
+
+            try:
+                logger.info(f"Calling LLM '{name}' (async)")
+                response = await client.chat.completions.create(
+                    model=AVAILABLE_LLMS[name].model,
+                    messages=messages,
+                )
+                # A fallback model's answer is not what the key (the requested model) names.
+                if key and name == llm_name:
+                    try:
+                        await self.cache.aset(key, response, cache_ttl)
+                    except Exception as e:
+                        logger.warning(f"LLM cache store failed: {e}")
+                return response
+            except Exception as e:
+                logger.warning(f"LLM '{name}' async call failed: {e}")
+                last_exception = e
+
+        raise Exception(
+            f"All LLM calls failed in fallback chain {chain}") from last_exception
+
+
+_default_llm_caller: Optional[LLMCaller] = None
+
+
+def get_default_llm_caller() -> LLMCaller:
+    """Process-wide LLMCaller so every worker module in a process shares one set of clients."""
+    global _default_llm_caller
+    if _default_llm_caller is None:
+        _default_llm_caller = LLMCaller(LLMClientManager())
+    return _default_llm_caller
@@ -0,0 +1,30 @@
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long closing a retired loop's connections may block the caller.
+CLOSE_TIMEOUT_SECONDS = 5
+
+
+def close_on_loop(loop: Optional[asyncio.AbstractEventLoop], closer: Awaitable) -> None:
+    """Run `closer` on `loop`, the loop whose connections it closes.
+
+    RQ runs each job in a new loop and leaves the previous one idle but open, so an
+    idle loop is driven once more on a helper thread to release its sockets.
+    """
+    if loop is None or loop.is_closed():
+        # Nothing can run on it any more; the sockets are released when collected.
+        closer.close()
+        return
+    try:
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(closer, loop)
+            return
+        thread = threading.Thread(target=loop.run_until_complete, args=(closer,), daemon=True)
+        thread.start()
+        thread.join(CLOSE_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning(f"Closing connections of a previous event loop failed: {e}")
@@ -0,0 +1,208 @@
+"""Asyncio-native job runner for the RQ queues.
+
+`rq worker` forks a work-horse per job and runs each coroutine in a fresh event
+loop, so LLM, Mongo and HTTP clients are rebuilt for every job and one worker
+runs one job at a time. This runner pulls from the same Valkey queues but runs
+up to --concurrency jobs at once in a single long-lived loop, so module-level
+clients and their connection pools are reused across jobs. On SIGTERM it stops
+dequeuing, lets running jobs finish (requeueing those past the grace period),
+then shuts down the extraction pool and closes the pooled LLM connections.
+
+    python -m app.queue.async_worker research-low --concurrency 8
+
+Job status, the started/finished/failed registries and the worker record are
+kept up to date and heartbeated, so /metrics/queues and `rq info` stay
+meaningful and RQ's registry cleanup fails the jobs of a worker that died. It
+does not run the RQ scheduler; keep one `rq worker --with-scheduler` for
+scheduled jobs.
+"""
+import argparse
+import asyncio
+import inspect
+import os
+import signal
+import socket
+import traceback
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from rq import Queue, Worker
+from rq.exceptions import DequeueTimeout
+from rq.executions import Execution
+from rq.job import Job, JobStatus
+from .q import redis_connection
+from .metrics import current_async_job, incr_metric
+from .retention import schedule_retention
+from .extraction import shutdown_extract_pool
+from app.llm_module.llm_caller import get_default_llm_caller
+
+ASYNC_WORKER_CONCURRENCY = int(os.getenv("ASYNC_WORKER_CONCURRENCY", "8"))
+# Seconds running jobs get to finish after SIGTERM before they are cancelled and requeued.
+ASYNC_WORKER_SHUTDOWN_GRACE = int(os.getenv("ASYNC_WORKER_SHUTDOWN_GRACE", "60"))
+DEQUEUE_POLL_SECONDS = 1
+# Same cadence and slack as `rq worker`: entries outlive a missed beat by a minute.
+HEARTBEAT_INTERVAL_SECONDS = 30
+HEARTBEAT_TTL_SECONDS = HEARTBEAT_INTERVAL_SECONDS + 60
+RESULT_TTL_SECONDS = 500
+FAILURE_TTL_SECONDS = 7 * 24 * 3600
+
+
+class AsyncWorker:
+    def __init__(self, queue_names: List[str], concurrency: int = ASYNC_WORKER_CONCURRENCY):
+        self.queues = [Queue(name, connection=redis_connection) for name in queue_names]
+        self.concurrency = concurrency
+        self.name = f"async-{socket.gethostname()}-{os.getpid()}"
+        self._slots = asyncio.Semaphore(concurrency)
+        self._running: Set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+        # Only used for RQ's worker record (registration and heartbeat); it never runs jobs.
+        self._record = Worker(self.queues, name=self.name, connection=redis_connection)
+        self._executions: Dict[str, Tuple[Job, Execution]] = {}
+
+    def request_stop(self):
+        if not self._stopping.is_set():
+            print(f"[AsyncWorker] {self.name} stopping, waiting for {len(self._running)} running job(s)")
+            self._stopping.set()
+
+    def _dequeue(self) -> Optional[Tuple[Job, Queue]]:
+        try:
+            return Queue.dequeue_any(self.queues, DEQUEUE_POLL_SECONDS, connection=redis_connection)
+        except DequeueTimeout:
+            return None
+
+    def _heartbeat(self):
+        with redis_connection.pipeline() as pipeline:
+            self._record.heartbeat(HEARTBEAT_TTL_SECONDS, pipeline=pipeline)
+            for job, execution in self._executions.values():
+                execution.heartbeat(job.started_job_registry, HEARTBEAT_TTL_SECONDS, pipeline=pipeline)
+            pipeline.execute()
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                self._heartbeat()
+                # Cheap no-op while a run is pending; restarts retention if a run was lost.
+                schedule_retention()
+            except Exception as e:
+                print(f"[AsyncWorker] heartbeat failed: {e}")
+
+    async def run(self):
+        print(f"[AsyncWorker] {self.name} listening on {[q.name for q in self.queues]} "
+              f"with concurrency {self.concurrency}")
+        self._record.register_birth()
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            await self._work()
+        finally:
+            heartbeat.cancel()
+            await self._close_shared_clients()
+            self._record.register_death()
+
+    async def _close_shared_clients(self):
+        # Jobs have drained: stop the extraction processes and close pooled LLM connections.
+        try:
+            await asyncio.to_thread(shutdown_extract_pool)
+            await get_default_llm_caller().client_manager.aclose()
+        except Exception as e:
+            print(f"[AsyncWorker] closing shared clients failed: {e}")
+
+    async def _work(self):
+        while not self._stopping.is_set():
+            await self._slots.acquire()
+            if self._stopping.is_set():
+                self._slots.release()
+                break
+            # BLPOP blocks, so it runs in a thread; the poll timeout lets shutdown be noticed.
+            dequeued = await asyncio.to_thread(self._dequeue)
+            if dequeued is None:
+                self._slots.release()
+                continue
+            job, queue = dequeued
+            task = asyncio.create_task(self._perform(job, queue))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: self._slots.release())
+        await self._drain()
+
+    async def _drain(self):
+        if not self._running:
+            return
+        _, pending = await asyncio.wait(set(self._running), timeout=ASYNC_WORKER_SHUTDOWN_GRACE)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def _start_execution(self, job: Job):
+        with redis_connection.pipeline() as pipeline:
+            execution = Execution.create(job, HEARTBEAT_TTL_SECONDS, pipeline=pipeline)
+            pipeline.execute()
+        self._executions[job.id] = (job, execution)
+
+    def _end_execution(self, job: Job):
+        _, execution = self._executions.pop(job.id)
+        with redis_connection.pipeline() as pipeline:
+            execution.delete(job, pipeline)
+            pipeline.execute()
+
+    async def _perform(self, job: Job, queue: Queue):
+        current_async_job.set(job)
+        job.started_at = datetime.now(timezone.utc)
+        job.worker_name = self.name
+        job.save()
+        job.set_status(JobStatus.STARTED)
+        self._start_execution(job)
+        try:
+            return await self._execute(job, queue)
+        finally:
+            self._end_execution(job)
+
+    async def _execute(self, job: Job, queue: Queue):
+        try:
+            timeout = job.timeout if job.timeout and job.timeout > 0 else None
+            if inspect.iscoroutinefunction(job.func):
+                result = await asyncio.wait_for(job.func(*job.args, **job.kwargs), timeout)
+            else:
+                # Synchronous jobs would block every other job on the loop.
+                result = await asyncio.wait_for(asyncio.to_thread(job.func, *job.args, **job.kwargs), timeout)
+        except asyncio.CancelledError:
+            # Shutdown grace expired: put the job back so another worker picks it up.
+            print(f"[AsyncWorker] requeueing interrupted job {job.id}")
+            queue.enqueue_job(job)
+            incr_metric("async_worker", "requeued")
+            raise
+        except Exception:
+            exc_string = traceback.format_exc()
+            print(f"[AsyncWorker] job {job.id} failed:\n{exc_string}")
+            job.ended_at = datetime.now(timezone.utc)
+            job.save()
+            job.set_status(JobStatus.FAILED)
+            queue.failed_job_registry.add(job, ttl=FAILURE_TTL_SECONDS, exc_string=exc_string)
+            incr_metric("async_worker", "failed")
+            return
+        job.ended_at = datetime.now(timezone.utc)
+        job.save()
+        job.set_status(JobStatus.FINISHED)
+        queue.finished_job_registry.add(job, ttl=RESULT_TTL_SECONDS)
+        incr_metric("async_worker", "finished")
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run RQ jobs concurrently on one asyncio loop.")
+    parser.add_argument("queues", nargs="+", help="queue names, highest priority first")
+    parser.add_argument("--concurrency", type=int, default=ASYNC_WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    async def run():
+        worker = AsyncWorker(args.queues, args.concurrency)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.request_stop)
+        await worker.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+from redis.asyncio import Redis as AsyncRedis
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+from app.llm_module.loops import close_on_loop
+from .q import redis_connection
+from .metrics import incr_metric
+
+CANCEL_KEY_PREFIX = "cancel:"
+# Flags only need to outlive the longest job.
+CANCEL_FLAG_TTL_SECONDS = 24 * 3600
+CANCEL_POLL_SECONDS = 0.5
+
+T = TypeVar("T")
+# should_cancel() -> True once the work wrapped by run_cancellable is no longer wanted
+CancelCondition = Callable[[], Awaitable[bool]]
+
+_async_redis: Optional[AsyncRedis] = None
+_async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def jobfit_job_id(file_id: str) -> str:
+    return f"{file_id}-jobfit"
+
+
+def agent_job_id(file_id: str) -> str:
+    return f"{file_id}-agent"
+
+
+def request_cancel(file_id: str) -> int:
+    """Flag `file_id` as cancelled and drop its jobs that have not started yet.
+
+    Returns how many queued jobs were removed.
+    """
+    redis_connection.set(f"{CANCEL_KEY_PREFIX}{file_id}", 1, ex=CANCEL_FLAG_TTL_SECONDS)
+    removed = 0
+    for job_id in (jobfit_job_id(file_id), agent_job_id(file_id)):
+        try:
+            job = Job.fetch(job_id, connection=redis_connection)
+        except NoSuchJobError:
+            continue
+        if job.get_status() in (JobStatus.QUEUED, JobStatus.DEFERRED, JobStatus.SCHEDULED):
+            job.cancel()
+            removed += 1
+    if removed:
+        incr_metric("cancellation", "queued_jobs_removed", removed)
+    return removed
+
+
+def is_cancelled(file_id: str) -> bool:
+    try:
+        return bool(redis_connection.exists(f"{CANCEL_KEY_PREFIX}{file_id}"))
+    except Exception:
+        return False
+
+
+def raise_if_cancelled(file_id: str):
+    if is_cancelled(file_id):
+        raise JobCancelled(file_id)
+
+
+def _get_async_redis() -> AsyncRedis:
+    # Async connections belong to the loop that opened them; RQ jobs each run in a new loop.
+    global _async_redis, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_loop is not loop:
+        if _async_redis is not None:
+            close_on_loop(_async_loop, _async_redis.aclose())
+        _async_loop = loop
+        _async_redis = AsyncRedis(host="valkey", port="6379")
+    return _async_redis
+
+
+async def all_cancelled(file_ids: Iterable[str]) -> bool:
+    """True if every one of `file_ids` (at least one) is flagged, in a single round trip."""
+    keys = {f"{CANCEL_KEY_PREFIX}{fid}" for fid in file_ids}
+    if not keys:
+        return False
+    try:
+        return await _get_async_redis().exists(*keys) == len(keys)
+    except Exception:
+        return False
+
+
+async def run_cancellable(work: Awaitable[T], file_ids: Iterable[str],
+                          should_cancel: Optional[CancelCondition] = None) -> T:
+    """Await `work`, cancelling it (and every fetch / LLM task inside it) once all `file_ids` are cancelled.
+
+    `should_cancel` replaces that default check, e.g. to also wait for uploads sharing the work.
+    """
+    file_ids = list(file_ids)
+    if should_cancel is None:
+        async def should_cancel() -> bool:
+            return await all_cancelled(file_ids)
+    task = asyncio.ensure_future(work)
+    while True:
+        try:
+            done, _ = await asyncio.wait({task}, timeout=CANCEL_POLL_SECONDS)
+        except asyncio.CancelledError:
+            # asyncio.wait does not cancel what it waits on; do not leave `work` running.
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise
+        if done:
+            return task.result()
+        if await should_cancel():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise JobCancelled(",".join(file_ids))
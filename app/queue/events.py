@@ -0,0 +1,64 @@
+import asyncio
+from typing import Optional
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import PubSub
+from .q import redis_connection
+
+# Workers publish on this channel whenever they change a file document, so the
+# SSE endpoint can wait for a push instead of re-reading Mongo on a timer.
+STATUS_CHANNEL_PREFIX = "file-status:"
+
+async_redis_connection = AsyncRedis(
+    host="valkey",
+    port="6379"
+)
+
+
+def status_channel(file_id: str) -> str:
+    return f"{STATUS_CHANNEL_PREFIX}{file_id}"
+
+
+def publish_status(file_id: str) -> None:
+    try:
+        redis_connection.publish(status_channel(file_id), "changed")
+    except Exception as e:
+        print(f"[Events] publish failed for ID {file_id}: {e}")
+
+
+async def subscribe_status(file_id: str) -> Optional[PubSub]:
+    """Subscribe to status changes, or return None if Valkey is unreachable."""
+    pubsub = async_redis_connection.pubsub()
+    try:
+        await pubsub.subscribe(status_channel(file_id))
+        return pubsub
+    except Exception as e:
+        print(f"[Events] subscribe failed for ID {file_id}, falling back to polling: {e}")
+        await close_subscription(pubsub)
+        return None
+
+
+async def wait_for_status(pubsub: PubSub, timeout: float) -> bool:
+    """Block until a change is published or `timeout` elapses.
+
+    Returns True if at least one change arrived. Bursts of changes are drained so
+    the caller re-reads the document once per burst rather than once per write.
+    """
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+            return False
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+        if message is not None:
+            break
+
+    while await pubsub.get_message(ignore_subscribe_messages=True, timeout=0):
+        pass
+    return True
+
+
+async def close_subscription(pubsub: PubSub) -> None:
+    try:
+        await pubsub.aclose()
+    except Exception:
+        pass
@@ -0,0 +1,58 @@
+# Kept free of app imports so extraction processes start without loading the
+# LLM clients, Mongo or the agent worker.
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Dict, Optional
+import trafilatura
+
+# 0 runs extraction on the default thread pool instead of separate processes.
+EXTRACT_PROCESSES = int(os.getenv("EXTRACT_PROCESSES", str(os.cpu_count() or 1)))
+EXTRACT_START_METHOD = os.getenv("EXTRACT_START_METHOD", "forkserver")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_extract_pool() -> Optional[Executor]:
+    global _pool
+    if EXTRACT_PROCESSES <= 0:
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_PROCESSES,
+            mp_context=multiprocessing.get_context(EXTRACT_START_METHOD),
+        )
+    return _pool
+
+
+def shutdown_extract_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+def extract_page(url: str, body: bytes, charset: Optional[str] = None) -> Dict[str, Any]:
+    html = body.decode(charset or "utf-8", errors="replace")
+    extracted = trafilatura.extract(html, include_comments=False, include_tables=False)
+    text = extracted or ""
+
+    # Find <title>
+    title = ""
+    try:
+        start = html.lower().find("<title")
+        if start != -1:
+            start = html.find(">", start) + 1
+            end = html.find("</title>", start)
+            title = html[start:end].strip() if end != -1 else ""
+    except Exception:
+        title = ""
+
+    return {"url": url, "status": 200, "title": title, "text": text}
+
+
+async def extract_page_async(url: str, body: bytes, charset: Optional[str] = None) -> Dict[str, Any]:
+    """Run extract_page on the extraction pool so the event loop keeps fetching meanwhile."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_extract_pool(), extract_page, url, body, charset)
@@ -0,0 +1,94 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FETCH_TIMEOUT_SECONDS = int(os.getenv("FETCH_TIMEOUT_SECONDS", "15"))
+FETCH_MAX_CONNECTIONS = int(os.getenv("FETCH_MAX_CONNECTIONS", "6"))
+FETCH_MAX_PER_HOST = int(os.getenv("FETCH_MAX_PER_HOST", "2"))
+# Pages larger than this are abandoned mid-stream.
+FETCH_MAX_PAGE_BYTES = int(os.getenv("FETCH_MAX_PAGE_BYTES", str(3 * 1024 * 1024)))
+# Byte budget for one fetcher (one agent run); later fetches fail fast once it is spent.
+FETCH_MAX_TOTAL_BYTES = int(os.getenv("FETCH_MAX_TOTAL_BYTES", str(40 * 1024 * 1024)))
+FETCH_CHUNK_BYTES = 64 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; JobFitBot/1.0)"
+
+
+class PageTooLarge(Exception):
+    pass
+
+
+class AsyncPageFetcher:
+    """Keep-alive HTTP fetcher shared by every URL of one agent run.
+
+    Connections are pooled per host, at most FETCH_MAX_PER_HOST requests hit the same
+    host at once, and bodies are streamed so oversized pages are dropped early.
+    """
+
+    def __init__(self, max_total_bytes: int = FETCH_MAX_TOTAL_BYTES,
+                 max_page_bytes: int = FETCH_MAX_PAGE_BYTES):
+        self.max_total_bytes = max_total_bytes
+        self.max_page_bytes = max_page_bytes
+        self.bytes_read = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncPageFetcher":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=FETCH_MAX_CONNECTIONS,
+                limit_per_host=FETCH_MAX_PER_HOST,
+                ttl_dns_cache=300,
+            ),
+            timeout=aiohttp.ClientTimeout(total=FETCH_TIMEOUT_SECONDS),
+            headers={"User-Agent": USER_AGENT},
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    async def _read_capped(self, resp: aiohttp.ClientResponse) -> bytes:
+        declared = resp.content_length
+        if declared is not None and declared > self.max_page_bytes:
+            raise PageTooLarge(f"Content-Length {declared} exceeds {self.max_page_bytes}")
+        chunks = []
+        size = 0
+        async for chunk in resp.content.iter_chunked(FETCH_CHUNK_BYTES):
+            size += len(chunk)
+            self.bytes_read += len(chunk)
+            if size > self.max_page_bytes:
+                raise PageTooLarge(f"body exceeds {self.max_page_bytes} bytes")
+            if self.bytes_read > self.max_total_bytes:
+                raise PageTooLarge("total fetch budget exhausted")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def fetch(self, url: str, etag: Optional[str] = None,
+                    last_modified: Optional[str] = None) -> Dict[str, Any]:
+        """Return {"url", "status", "body", "charset", "etag", "last_modified"} or {"url", "status", "error"}.
+
+        The body is left as raw bytes so it can be shipped to an extraction process as-is.
+        """
+        if self.bytes_read >= self.max_total_bytes:
+            return {"url": url, "status": None, "error": "total fetch budget exhausted", "text": None}
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            async with self._session.get(url, headers=headers) as resp:
+                status = resp.status
+                if status == 304:
+                    return {"url": url, "status": status, "text": None}
+                if status != 200:
+                    return {"url": url, "status": status, "error": f"HTTP {status}", "text": None}
+                body = await self._read_capped(resp)
+                return {"url": url, "status": status, "body": body, "charset": resp.charset,
+                        "etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+        except (asyncio.TimeoutError, aiohttp.ClientError, PageTooLarge) as e:
+            return {"url": url, "status": None, "error": str(e) or type(e).__name__, "text": None}
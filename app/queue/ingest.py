@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from ..db.collections.files import set_file_fields
+from ..db.collections.resumes import resumes_collection, ResumeArtifactSchema
+from ..utils.pdf import render_pages_b64, extract_text_layer, is_usable_text
+
+load_dotenv()
+
+# Pages of a scanned resume sent to the vision model, and the base64 budget they share.
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "4"))
+VISION_MAX_REQUEST_BYTES = int(os.getenv("VISION_MAX_REQUEST_BYTES", str(4 * 1024 * 1024)))
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+async def _store(artifact: Dict[str, Any], replace: bool = False) -> Dict[str, Any]:
+    # Identical content is ingested once; a concurrent duplicate keeps the first copy. `replace`
+    # refreshes an artifact whose page images retention has already expired.
+    update = {"$set": artifact} if replace else {"$setOnInsert": artifact}
+    await resumes_collection.update_one({"_id": artifact["_id"]}, update, upsert=True)
+    return artifact
+
+
+def is_reusable(artifact: Dict[str, Any]) -> bool:
+    return bool(artifact.get("text") or artifact.get("pages_b64"))
+
+
+async def ingest_file(file_path: str) -> Dict[str, Any]:
+    """Normalize an uploaded PDF into a stored artifact: text layer if usable, page images otherwise."""
+    content_hash = await asyncio.to_thread(hash_file, file_path)
+    existing = await load_artifact(content_hash)
+    if existing and is_reusable(existing):
+        print(f"[Ingest] Reusing artifact {content_hash[:12]}")
+        return existing
+
+    text = await asyncio.to_thread(extract_text_layer, file_path)
+    if is_usable_text(text):
+        source, pages_b64 = "text_layer", []
+    else:
+        text = ""
+        source = "vision"
+        pages_b64 = await asyncio.to_thread(
+            render_pages_b64, file_path, RESUME_MAX_PAGES, max_total_bytes=VISION_MAX_REQUEST_BYTES
+        )
+    print(f"[Ingest] Ingested {file_path} via {source}")
+    return await _store(ResumeArtifactSchema(
+        _id=content_hash, source=source, text=text, pages_b64=pages_b64, created_at=time.time()
+    ), replace=existing is not None)
+
+
+async def ingest_text(resume_text: str) -> Dict[str, Any]:
+    content_hash = hash_text(resume_text)
+    existing = await load_artifact(content_hash)
+    if existing:
+        return existing
+    return await _store(ResumeArtifactSchema(
+        _id=content_hash, source="text_input", text=resume_text, pages_b64=[], created_at=time.time()
+    ))
+
+
+async def load_artifact(content_hash: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not content_hash:
+        return None
+    return await resumes_collection.find_one({"_id": content_hash})
+
+
+async def attach_artifact(file_id: str, artifact: Dict[str, Any]):
+    await set_file_fields(file_id, {"resume_hash": artifact["_id"]})
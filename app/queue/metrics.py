@@ -0,0 +1,63 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from rq import get_current_job
+from rq.job import Job
+from .q import redis_connection, QUEUES
+
+# Counters live in Valkey hashes so API and worker processes share them.
+METRICS_PREFIX = "metrics:"
+
+# Set by the asyncio worker, where RQ's own get_current_job() has no job on its stack.
+current_async_job: ContextVar[Optional[Job]] = ContextVar("current_async_job", default=None)
+
+
+def incr_metric(name: str, field: str, amount: int = 1) -> None:
+    try:
+        redis_connection.hincrby(f"{METRICS_PREFIX}{name}", field, amount)
+    except Exception as e:
+        print(f"[Metrics] failed to record {name}.{field}: {e}")
+
+
+def get_metrics() -> Dict[str, Dict[str, int]]:
+    metrics = {}
+    for key in redis_connection.scan_iter(match=f"{METRICS_PREFIX}*"):
+        name = key.decode()[len(METRICS_PREFIX):]
+        metrics[name] = {k.decode(): int(v) for k, v in redis_connection.hgetall(key).items()}
+    return metrics
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # RQ has returned both naive-UTC and aware timestamps across versions
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def record_queue_wait() -> None:
+    """Record how long the current RQ job sat in its queue. Call at the start of a job."""
+    job = get_current_job() or current_async_job.get()
+    if job is None or job.enqueued_at is None:
+        return
+    started = _as_utc(job.started_at) if job.started_at else datetime.now(timezone.utc)
+    wait_ms = int((started - _as_utc(job.enqueued_at)).total_seconds() * 1000)
+    incr_metric("queue_wait", f"{job.origin}:jobs")
+    incr_metric("queue_wait", f"{job.origin}:total_ms", max(wait_ms, 0))
+
+
+def get_queue_stats() -> Dict[str, Dict[str, Any]]:
+    """Depth and age of the oldest waiting job for every queue."""
+    stats = {}
+    now = datetime.now(timezone.utc)
+    for queue in QUEUES:
+        oldest_wait = 0.0
+        head = queue.get_job_ids(0, 0)
+        if head:
+            job = queue.fetch_job(head[0])
+            if job is not None and job.enqueued_at is not None:
+                oldest_wait = (now - _as_utc(job.enqueued_at)).total_seconds()
+        stats[queue.name] = {
+            "depth": queue.count,
+            "oldest_wait_seconds": round(oldest_wait, 3),
+            "started": queue.started_job_registry.count,
+            "failed": queue.failed_job_registry.count,
+        }
+    return stats
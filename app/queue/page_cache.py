@@ -0,0 +1,83 @@
+import os
+import time
+from typing import Any, Dict, Optional
+from pymongo import ASCENDING
+from dotenv import load_dotenv
+from ..db.collections.pages import pages_collection, PageSchema
+
+load_dotenv()
+
+# Pages fetched more recently than this are served without touching the network.
+PAGE_CACHE_FRESH_SECONDS = int(os.getenv("PAGE_CACHE_FRESH_SECONDS", str(7 * 24 * 3600)))
+# Least recently used pages beyond this count are evicted.
+PAGE_CACHE_MAX_ENTRIES = int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "5000"))
+
+_indexes_ready = False
+
+
+async def ensure_page_cache_indexes():
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    await pages_collection.create_index([("url", ASCENDING)], unique=True)
+    await pages_collection.create_index([("last_used_at", ASCENDING)])
+    _indexes_ready = True
+
+
+def is_fresh(page: Dict[str, Any]) -> bool:
+    return time.time() - page.get("fetched_at", 0) < PAGE_CACHE_FRESH_SECONDS
+
+
+def as_fetch_result(page: Dict[str, Any]) -> Dict[str, Any]:
+    return {"url": page["url"], "status": 200, "title": page.get("title", ""), "text": page.get("text", ""), "cached": True}
+
+
+async def get_cached_page(url: str) -> Optional[Dict[str, Any]]:
+    try:
+        await ensure_page_cache_indexes()
+        return await pages_collection.find_one({"url": url}, {"_id": 0})
+    except Exception as e:
+        print(f"[PageCache] lookup failed for {url}: {e}")
+        return None
+
+
+async def touch_page(url: str, revalidated: bool = False):
+    now = time.time()
+    update = {"last_used_at": now}
+    if revalidated:
+        update["fetched_at"] = now
+    try:
+        await pages_collection.update_one({"url": url}, {"$set": update})
+    except Exception as e:
+        print(f"[PageCache] touch failed for {url}: {e}")
+
+
+async def store_page(result: Dict[str, Any]):
+    now = time.time()
+    page = PageSchema(
+        url=result["url"],
+        title=result.get("title") or "",
+        text=result.get("text") or "",
+        etag=result.get("etag"),
+        last_modified=result.get("last_modified"),
+        fetched_at=now,
+        last_used_at=now,
+    )
+    try:
+        await pages_collection.update_one({"url": page["url"]}, {"$set": page}, upsert=True)
+    except Exception as e:
+        print(f"[PageCache] store failed for {result['url']}: {e}")
+
+
+async def evict_pages():
+    """Trim the cache down to PAGE_CACHE_MAX_ENTRIES, dropping least recently used pages first."""
+    try:
+        overflow = await pages_collection.estimated_document_count() - PAGE_CACHE_MAX_ENTRIES
+        if overflow <= 0:
+            return
+        cursor = pages_collection.find({}, {"_id": 1}).sort("last_used_at", ASCENDING).limit(overflow)
+        ids = [page["_id"] async for page in cursor]
+        result = await pages_collection.delete_many({"_id": {"$in": ids}})
+        print(f"[PageCache] evicted {result.deleted_count} pages")
+    except Exception as e:
+        print(f"[PageCache] eviction failed: {e}")
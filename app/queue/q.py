@@ -5,4 +5,14 @@ redis_connection = Redis(
     host="valkey",
     port="6379"
 )
-q = Queue(connection=redis_connection)
\ No newline at end of file
+
+# Fast job-fit analysis gets its own lane so it never waits behind slow web research.
+JOBFIT_QUEUE_NAME = "jobfit-high"
+RESEARCH_QUEUE_NAME = "research-low"
+
+# default: maintenance and scheduled jobs
+q = Queue(connection=redis_connection)
+jobfit_q = Queue(JOBFIT_QUEUE_NAME, connection=redis_connection)
+research_q = Queue(RESEARCH_QUEUE_NAME, connection=redis_connection)
+
+QUEUES = [jobfit_q, research_q, q]
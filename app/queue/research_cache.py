@@ -0,0 +1,119 @@
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from dotenv import load_dotenv
+from ..db.collections.research import research_collection
+
+load_dotenv()
+
+# process_agent output depends only on (company, role), so it is shared across uploads.
+RESEARCH_CACHE_TTL_SECONDS = int(os.getenv("RESEARCH_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+# A running pipeline that has not finished within this window is assumed dead and can be reclaimed.
+RESEARCH_LEASE_SECONDS = int(os.getenv("RESEARCH_LEASE_SECONDS", "900"))
+
+_indexes_ready = False
+
+
+async def ensure_research_indexes():
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    await research_collection.create_index([("key", ASCENDING)], unique=True)
+    _indexes_ready = True
+
+
+def _normalize(value: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", (value or "").lower()).strip()
+
+
+def research_key(company: str, role: str) -> str:
+    return f"{_normalize(company)}|{_normalize(role)}"
+
+
+def _is_fresh(entry: Dict[str, Any]) -> bool:
+    return (
+        entry.get("status") == "ready"
+        and time.time() - (entry.get("completed_at") or 0) < RESEARCH_CACHE_TTL_SECONDS
+    )
+
+
+async def get_fresh_research(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        await ensure_research_indexes()
+        entry = await research_collection.find_one({"key": key})
+    except Exception as e:
+        print(f"[Research] lookup failed for {key}: {e}")
+        return None
+    return entry["result"] if entry and _is_fresh(entry) else None
+
+
+async def claim_research(key: str, company: str, role: str, owner: str) -> bool:
+    """Become the single runner for `key`. Returns False if another live job already owns it."""
+    # The unique index on key is what turns a lost race into DuplicateKeyError.
+    await ensure_research_indexes()
+    now = time.time()
+    try:
+        await research_collection.update_one(
+            {"key": key, "$or": [
+                {"status": {"$ne": "running"}},
+                {"lease_expires_at": {"$lt": now}},
+            ]},
+            {"$set": {
+                "company": company,
+                "role": role,
+                "status": "running",
+                "owner": owner,
+                "lease_expires_at": now + RESEARCH_LEASE_SECONDS,
+            }, "$setOnInsert": {"waiters": []}},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def attach_waiter(key: str, file_id: str) -> Optional[Dict[str, Any]]:
+    """Wait on a running pipeline without holding a worker slot.
+
+    Returns {"attached": True} if the owner will deliver the result to `file_id`,
+    or {"result": ...} if the pipeline finished in the meantime. None means the
+    caller should run the pipeline itself.
+    """
+    entry = await research_collection.find_one_and_update(
+        {"key": key, "status": "running", "lease_expires_at": {"$gte": time.time()}},
+        {"$addToSet": {"waiters": file_id}},
+    )
+    if entry is not None:
+        return {"attached": True}
+    result = await get_fresh_research(key)
+    return {"result": result} if result is not None else None
+
+
+async def get_waiters(key: str) -> List[str]:
+    entry = await research_collection.find_one({"key": key}, {"waiters": 1})
+    return (entry or {}).get("waiters", [])
+
+
+async def complete_research(key: str, result: Dict[str, Any]) -> List[str]:
+    """Store the result and return the file_ids that were waiting on it."""
+    entry = await research_collection.find_one_and_update(
+        {"key": key},
+        {"$set": {"status": "ready", "result": result, "completed_at": time.time(), "waiters": []}},
+    )
+    return (entry or {}).get("waiters", [])
+
+
+async def fail_research(key: str) -> List[str]:
+    entry = await research_collection.find_one_and_update(
+        {"key": key},
+        {"$set": {"status": "failed", "waiters": []}},
+    )
+    return (entry or {}).get("waiters", [])
+
+
+async def invalidate_research(key: str) -> int:
+    result = await research_collection.delete_one({"key": key, "status": {"$ne": "running"}})
+    return result.deleted_count
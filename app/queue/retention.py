@@ -0,0 +1,169 @@
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+import bson
+from bson import ObjectId
+from bson.errors import InvalidId
+from dotenv import load_dotenv
+from ..db.collections.files import files_collection
+from ..db.collections.files_archive import files_archive_collection, ARCHIVE_FIELDS, ensure_archive_indexes
+from ..db.collections.resumes import resumes_collection
+from .metrics import incr_metric
+from .q import q, redis_connection
+
+load_dotenv()
+
+UPLOADS_ROOT = "/mnt/uploads"
+IMAGES_ROOT = f"{UPLOADS_ROOT}/images"
+STAGING_ROOT = f"{UPLOADS_ROOT}/staging"
+
+# Retention policy (seconds).
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+RETENTION_UPLOAD_SECONDS = int(os.getenv("RETENTION_UPLOAD_SECONDS", "3600"))
+RETENTION_IMAGES_SECONDS = int(os.getenv("RETENTION_IMAGES_SECONDS", str(24 * 3600)))
+RETENTION_STAGING_SECONDS = int(os.getenv("RETENTION_STAGING_SECONDS", "3600"))
+RETENTION_ARCHIVE_AFTER_SECONDS = int(os.getenv("RETENTION_ARCHIVE_AFTER_SECONDS", str(7 * 24 * 3600)))
+RETENTION_BATCH_SIZE = 200
+
+RETENTION_SCHEDULED_KEY = "retention:scheduled"
+FINAL_STATUSES = ["processed", "failed", "error", "cancelled"]
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _remove(path: str) -> int:
+    size = _dir_size(path) if os.path.isdir(path) else os.path.getsize(path)
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        os.remove(path)
+    return size
+
+
+def _aged_file_dirs(root: str, max_age: int) -> Dict[str, str]:
+    """file_id -> path for per-upload directories older than `max_age` (age from the ObjectId)."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+    aged = {}
+    if not os.path.isdir(root):
+        return aged
+    for name in os.listdir(root):
+        try:
+            oid = ObjectId(name)
+        except InvalidId:
+            continue
+        if oid.generation_time < cutoff:
+            aged[name] = os.path.join(root, name)
+    return aged
+
+
+async def purge_uploads() -> int:
+    """Delete raw uploads whose job has finished, or whose document is already gone."""
+    aged = _aged_file_dirs(UPLOADS_ROOT, RETENTION_UPLOAD_SECONDS)
+    if not aged:
+        return 0
+    active = set()
+    cursor = files_collection.find(
+        {"_id": {"$in": [ObjectId(fid) for fid in aged]}, "jobfit_status": {"$nin": FINAL_STATUSES}},
+        {"_id": 1},
+    )
+    async for doc in cursor:
+        active.add(str(doc["_id"]))
+    return sum(_remove(path) for fid, path in aged.items() if fid not in active)
+
+
+def purge_images() -> int:
+    return sum(_remove(path) for path in _aged_file_dirs(IMAGES_ROOT, RETENTION_IMAGES_SECONDS).values())
+
+
+def purge_staging() -> int:
+    if not os.path.isdir(STAGING_ROOT):
+        return 0
+    cutoff = time.time() - RETENTION_STAGING_SECONDS
+    reclaimed = 0
+    for name in os.listdir(STAGING_ROOT):
+        path = os.path.join(STAGING_ROOT, name)
+        if os.path.getmtime(path) < cutoff:
+            reclaimed += _remove(path)
+    return reclaimed
+
+
+async def expire_page_images() -> int:
+    """Drop rendered page images from resume artifacts once their jobs are long done."""
+    cutoff = time.time() - RETENTION_IMAGES_SECONDS
+    reclaimed = 0
+    cursor = resumes_collection.aggregate([
+        {"$match": {"created_at": {"$lt": cutoff}, "pages_b64.0": {"$exists": True}}},
+        {"$project": {"size": {"$sum": {"$map": {"input": "$pages_b64", "in": {"$strLenBytes": "$$this"}}}}}},
+    ])
+    ids = []
+    async for doc in cursor:
+        ids.append(doc["_id"])
+        reclaimed += doc["size"]
+    if ids:
+        await resumes_collection.update_many({"_id": {"$in": ids}}, {"$set": {"pages_b64": []}})
+    return reclaimed
+
+
+async def archive_results() -> int:
+    """Move finished results older than the archive age into files_archive, keeping compact fields only."""
+    await ensure_archive_indexes()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=RETENTION_ARCHIVE_AFTER_SECONDS)
+    reclaimed = 0
+    while True:
+        docs: List[dict] = await files_collection.find(
+            {"created_at": {"$lt": cutoff}, "jobfit_status": {"$in": FINAL_STATUSES}},
+        ).limit(RETENTION_BATCH_SIZE).to_list()
+        if not docs:
+            return reclaimed
+        archived_at = datetime.now(timezone.utc)
+        compact = [
+            {"_id": doc["_id"], "archived_at": archived_at, **{f: doc[f] for f in ARCHIVE_FIELDS if f in doc}}
+            for doc in docs
+        ]
+        # Upsert-by-id keeps a rerun after a partial failure idempotent.
+        for entry in compact:
+            await files_archive_collection.replace_one({"_id": entry["_id"]}, entry, upsert=True)
+        await files_collection.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        reclaimed += sum(len(bson.encode(doc)) for doc in docs) - sum(len(bson.encode(c)) for c in compact)
+
+
+async def run_retention():
+    """Scheduled RQ job: apply the retention policy, record bytes reclaimed, reschedule itself."""
+    print("[Retention] start")
+    reclaimed = {}
+    try:
+        reclaimed["uploads"] = await purge_uploads()
+        reclaimed["images"] = purge_images()
+        reclaimed["staging"] = purge_staging()
+        reclaimed["page_images"] = await expire_page_images()
+        reclaimed["archive"] = await archive_results()
+        for kind, size in reclaimed.items():
+            incr_metric("retention_bytes_reclaimed", kind, size)
+        print(f"[Retention] reclaimed bytes: {reclaimed}")
+    finally:
+        redis_connection.delete(RETENTION_SCHEDULED_KEY)
+        schedule_retention()
+    return reclaimed
+
+
+def schedule_retention(delay_seconds: int = RETENTION_INTERVAL_SECONDS) -> bool:
+    """Schedule the next run unless one is already pending.
+
+    Called after each run and, to re-arm retention after a worker died mid-run and the pending
+    key expired, from API startup, /metrics/queues and every AsyncWorker heartbeat.
+    """
+    if not redis_connection.set(RETENTION_SCHEDULED_KEY, 1, nx=True, ex=delay_seconds * 2):
+        return False
+    q.enqueue_in(timedelta(seconds=delay_seconds), run_retention)
+    return True
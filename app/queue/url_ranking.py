@@ -0,0 +1,132 @@
+import json
+import os
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+import numpy as np
+from dotenv import load_dotenv
+from ..utils.relevance import bm25_scores
+
+load_dotenv()
+
+# At most this many fetched URLs per domain, so one site cannot take the whole fetch budget.
+DISCOVERY_MAX_PER_DOMAIN = int(os.getenv("DISCOVERY_MAX_PER_DOMAIN", "3"))
+# When set, every search's raw candidates are appended here as JSON lines for offline evaluation.
+DISCOVERY_RECORD_PATH = os.getenv("DISCOVERY_RECORD_PATH")
+
+# Prior usefulness of a domain for interview / hiring research, 0..1. Unlisted domains get DEFAULT_REPUTATION.
+DOMAIN_REPUTATION = {
+    "glassdoor.com": 1.0,
+    "levels.fyi": 1.0,
+    "teamblind.com": 0.9,
+    "leetcode.com": 0.9,
+    "reddit.com": 0.8,
+    "indeed.com": 0.7,
+    "interviewquery.com": 0.7,
+    "ambitionbox.com": 0.7,
+    "linkedin.com": 0.6,
+    "builtin.com": 0.6,
+    "medium.com": 0.5,
+    "quora.com": 0.4,
+    "youtube.com": 0.1,
+    "facebook.com": 0.1,
+    "instagram.com": 0.1,
+    "pinterest.com": 0.0,
+    "tiktok.com": 0.0,
+}
+DEFAULT_REPUTATION = 0.4
+# Pages on the company's own site are first-hand for hiring process and news.
+COMPANY_SITE_REPUTATION = 0.8
+
+# Second labels that form a public suffix under a country TLD (co.uk, com.au, ac.jp, ...).
+SECOND_LEVEL_SUFFIXES = frozenset(
+    "ac co com edu go gob gov ltd mil ne net nic or org plc sch".split()
+)
+
+# score = reputation + hits (fraction of queries that returned the URL) + snippet relevance + search rank
+WEIGHT_REPUTATION = 1.0
+WEIGHT_HITS = 1.0
+WEIGHT_SNIPPET = 1.0
+WEIGHT_RANK = 0.3
+
+
+def registered_domain(url: str) -> str:
+    """Host without "www." and subdomains, e.g. "uk.glassdoor.com" -> "glassdoor.com"."""
+    try:
+        host = (urlparse(url).hostname or "").lower()
+    except Exception:
+        return ""
+    parts = host.split(".")
+    if len(parts) > 2 and len(parts[-1]) == 2 and parts[-2] in SECOND_LEVEL_SUFFIXES:
+        return ".".join(parts[-3:])
+    return ".".join(parts[-2:])
+
+
+def domain_reputation(domain: str, company: str) -> float:
+    if domain in DOMAIN_REPUTATION:
+        return DOMAIN_REPUTATION[domain]
+    company_slug = "".join(ch for ch in company.lower() if ch.isalnum())
+    if company_slug and company_slug in domain.replace("-", "").replace(".", ""):
+        return COMPANY_SITE_REPUTATION
+    return DEFAULT_REPUTATION
+
+
+def add_result(candidates: Dict[str, Dict[str, Any]], result: Any, query_index: int, rank: int):
+    """Fold one search result into `candidates`, keyed by URL."""
+    if isinstance(result, dict):
+        url = result.get("href") or result.get("url") or result.get("link") or result.get("source")
+        title, snippet = result.get("title") or "", result.get("body") or result.get("snippet") or ""
+    else:
+        url, title, snippet = result, "", ""
+    if not url:
+        return
+    entry = candidates.setdefault(url, {"url": url, "title": title, "snippet": snippet, "queries": [], "best_rank": rank})
+    if query_index not in entry["queries"]:
+        entry["queries"].append(query_index)
+    entry["best_rank"] = min(entry["best_rank"], rank)
+    if len(snippet) > len(entry["snippet"]):
+        entry["title"], entry["snippet"] = title or entry["title"], snippet
+
+
+def score_candidates(candidates: List[Dict[str, Any]], company: str, query: str, num_queries: int,
+                     max_per_query: int) -> np.ndarray:
+    if not candidates:
+        return np.zeros(0)
+    reputation = np.array([domain_reputation(registered_domain(c["url"]), company) for c in candidates])
+    hits = np.array([len(c["queries"]) for c in candidates]) / max(num_queries, 1)
+    snippet = bm25_scores([f"{c['title']} {c['snippet']}" for c in candidates], query)
+    if snippet.max() > 0:
+        snippet = snippet / snippet.max()
+    rank = 1 - np.array([c["best_rank"] for c in candidates]) / max(max_per_query, 1)
+    return WEIGHT_REPUTATION * reputation + WEIGHT_HITS * hits + WEIGHT_SNIPPET * snippet + WEIGHT_RANK * rank
+
+
+def rank_urls(candidates: List[Dict[str, Any]], company: str, query: str, num_queries: int, max_per_query: int,
+              k: int, max_per_domain: int = DISCOVERY_MAX_PER_DOMAIN) -> List[str]:
+    """Top `k` candidate URLs by score, with at most `max_per_domain` from any one domain."""
+    scores = score_candidates(candidates, company, query, num_queries, max_per_query)
+    per_domain: Dict[str, int] = {}
+    urls: List[str] = []
+    for i in np.argsort(-scores, kind="stable"):
+        domain = registered_domain(candidates[i]["url"])
+        if per_domain.get(domain, 0) >= max_per_domain:
+            continue
+        per_domain[domain] = per_domain.get(domain, 0) + 1
+        urls.append(candidates[i]["url"])
+        if len(urls) >= k:
+            break
+    return urls
+
+
+def record_candidates(company: str, role: str, query: str, num_queries: int, max_per_query: int,
+                      candidates: List[Dict[str, Any]]):
+    if not DISCOVERY_RECORD_PATH:
+        return
+    try:
+        with open(DISCOVERY_RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "company": company, "role": role, "query": query, "num_queries": num_queries,
+                "max_per_query": max_per_query, "candidates": candidates,
+            }) + "\n")
+    except Exception as e:
+        print(f"[Discovery] could not record candidates: {e}")
+
@@ -1,24 +1,38 @@
 # app/queue/agent_worker.py
 import asyncio
 import json
-import hashlib
 import time
 import re
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
-import requests
-import trafilatura
 from duckduckgo_search import DDGS  # pip install duckduckgo-search
 
 from bson import ObjectId
-from ..db.collections.files import files_collection
-from app.llm_module.client_manager import LLMClientManager
-from app.llm_module.llm_caller import LLMCaller
-
-# Initialize your existing LLM client manager / caller
-client_manager = LLMClientManager()
-llm_caller = LLMCaller(client_manager)
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+from ..db.collections.files import files_collection, get_file_fields
+from ..db.batching import WriteCoalescer
+from .events import publish_status
+from .metrics import incr_metric, record_queue_wait
+from .q import research_q, redis_connection
+from .cancellation import JobCancelled, agent_job_id, all_cancelled, is_cancelled, run_cancellable
+from .research_cache import (
+    research_key, get_fresh_research, claim_research, attach_waiter,
+    complete_research, fail_research, get_waiters,
+)
+from .fetcher import AsyncPageFetcher
+from .extraction import extract_page_async
+from .url_ranking import add_result, rank_urls, record_candidates
+from .page_cache import get_cached_page, is_fresh, as_fetch_result, touch_page, store_page, evict_pages
+from ..utils.neardup import keep_longest
+from ..utils.relevance import (
+    count_tokens, select_relevant_text, select_within_budget, RELEVANCE_AGGREGATE_TOKEN_BUDGET, RESEARCH_INTENT,
+)
+from app.llm_module.llm_caller import get_default_llm_caller
+
+# Shared with the other worker modules in this process
+llm_caller = get_default_llm_caller()
 
 # ---- Configuration ----
 DISCOVERY_QUERIES_TEMPLATE = [
@@ -31,8 +45,29 @@ DISCOVERY_QUERIES_TEMPLATE = [
 ]
 
 MAX_DISCOVERY_PER_QUERY = 15
-MAX_FETCH_CONCURRENCY = 6
 MAX_DOCS_TO_FETCH = 30
+MAX_SUMMARY_CONCURRENCY = 6
+SUMMARY_TIMEOUT_SECONDS = 90
+# Claim/join rounds before giving up when other workers keep racing for the same research key.
+RESEARCH_CLAIM_ATTEMPTS = 3
+
+
+class ResearchUnavailable(Exception):
+    """The pipeline produced nothing worth sharing (no documents, failed aggregation); never cached."""
+
+
+# Delivered (but not cached) when research is unavailable, so the upload still completes.
+EMPTY_RESEARCH = {
+    "company_insights": {"hiring_trends": [], "interview_process": [], "employee_experiences": []},
+    "interview_prep": {"technical_questions": [], "behavioral_questions": [], "company_specific_questions": [], "prep_tips": []},
+    "web_research": {"latest_news": []},
+}
+
+
+# report(stage, status, items_count) -> appended to agent_progress of the uploads being served
+ProgressReporter = Callable[..., None]
+# cancelled() -> True once nobody is waiting for the result any more
+CancelCheck = Callable[[], bool]
 
 
 # -------------------------
@@ -49,8 +84,8 @@ def url_domain(url: str) -> str:
         return ""
 
 
-def hash_text(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+def research_query(company: str, role: str) -> str:
+    return f"{company} {role} {RESEARCH_INTENT}"
 
 
 def safe_json_load(s: str) -> Any:
@@ -74,100 +109,110 @@ def extract_json_from_text(text: str):
 # -------------------------
 # Discovery: DuckDuckGo search (DDGS)
 # -------------------------
-def discover_urls(company: str, role: str, max_per_query: int = MAX_DISCOVERY_PER_QUERY) -> List[str]:
+def discover_urls(company: str, role: str, max_per_query: int = MAX_DISCOVERY_PER_QUERY,
+                  cancelled: Optional[CancelCheck] = None) -> List[str]:
+    """Search every query template, then keep the MAX_DOCS_TO_FETCH best-ranked URLs under per-domain quotas."""
     queries = [t.format(company=company, role=role) for t in DISCOVERY_QUERIES_TEMPLATE]
-    seen = set()
-    urls: List[str] = []
+    candidates: Dict[str, Dict[str, Any]] = {}
 
     try:
         with DDGS() as ddgs:
-            for q in queries:
+            for query_index, q in enumerate(queries):
+                # Search is blocking, so check between queries rather than relying on task cancellation.
+                if cancelled and cancelled():
+                    incr_metric("cancellation", "agent_searches_skipped")
+                    raise JobCancelled(f"{company}/{role}")
                 print(f"[DEBUG] Searching DDG for query: {q}")
                 try:
                     results_iter = ddgs.text(q, max_results=max_per_query)
                 except TypeError:
                     results_iter = ddgs.text(q)
 
-                for r in results_iter:
-                    if isinstance(r, dict):
-                        candidate = r.get("href") or r.get("url") or r.get("link") or r.get("source")
-                    else:
-                        candidate = r
-                    if not candidate:
-                        continue
-                    if candidate in seen:
-                        continue
-                    seen.add(candidate)
-                    urls.append(candidate)
-                    if len(urls) >= MAX_DOCS_TO_FETCH:
-                        break
-                if len(urls) >= MAX_DOCS_TO_FETCH:
-                    break
+                for rank, r in enumerate(results_iter or []):
+                    add_result(candidates, r, query_index, rank)
+    except JobCancelled:
+        raise
     except Exception as e:
+        # Rank whatever the earlier queries returned.
         print("[DEBUG] DuckDuckGo search failed:", e)
-        return urls
 
-    print(f"[DEBUG] Discovered {len(urls)} URLs")
+    ranked = list(candidates.values())
+    query = research_query(company, role)
+    record_candidates(company, role, query, len(queries), max_per_query, ranked)
+    urls = rank_urls(ranked, company, query, len(queries), max_per_query, MAX_DOCS_TO_FETCH)
+    print(f"[DEBUG] Discovered {len(candidates)} URLs, fetching the top {len(urls)}")
     return urls
 
 
 # -------------------------
 # Fetch & extract
 # -------------------------
-def fetch_and_extract_blocking(url: str, timeout: int = 15) -> Dict[str, Any]:
+async def fetch_and_extract(url: str, fetcher: AsyncPageFetcher) -> Dict[str, Any]:
     try:
-        resp = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0 (compatible; JobFitBot/1.0)"})
-        status = resp.status_code
-        if status != 200:
-            return {"url": url, "status": status, "error": f"HTTP {status}", "text": None}
-        html = resp.text
-        extracted = trafilatura.extract(html, include_comments=False, include_tables=False)
-        text = extracted or ""
-
-        # Find <title>
-        title = ""
-        try:
-            start = html.lower().find("<title")
-            if start != -1:
-                start = html.find(">", start) + 1
-                end = html.find("</title>", start)
-                title = html[start:end].strip() if end != -1 else ""
-        except Exception:
-            title = ""
-
-        return {"url": url, "status": status, "title": title, "text": text}
-    except Exception as e:
-        return {"url": url, "status": None, "error": str(e), "text": None}
-
+        return await _fetch_and_extract(url, fetcher)
+    except asyncio.CancelledError:
+        incr_metric("cancellation", "agent_fetches_aborted")
+        raise
+
+
+async def _fetch_and_extract(url: str, fetcher: AsyncPageFetcher) -> Dict[str, Any]:
+    cached = await get_cached_page(url)
+    if cached and is_fresh(cached):
+        await touch_page(url)
+        return as_fetch_result(cached)
+
+    result = await fetcher.fetch(
+        url,
+        etag=cached.get("etag") if cached else None,
+        last_modified=cached.get("last_modified") if cached else None,
+    )
 
-async def fetch_and_extract(url: str, sem: asyncio.Semaphore) -> Dict[str, Any]:
-    async with sem:
-        return await asyncio.to_thread(fetch_and_extract_blocking, url)
+    if result.get("status") == 304 and cached:
+        await touch_page(url, revalidated=True)
+        return as_fetch_result(cached)
+    if result.get("status") == 200:
+        try:
+            extracted = await extract_page_async(url, result["body"], result.get("charset"))
+        except Exception as e:
+            extracted = {"url": url, "status": 200, "error": str(e), "text": None}
+        extracted["etag"] = result.get("etag")
+        extracted["last_modified"] = result.get("last_modified")
+        result = extracted
+        if result.get("text"):
+            await store_page(result)
+            return result
+    if cached:
+        # Serve the stale copy rather than nothing when the refetch fails.
+        return as_fetch_result(cached)
+    return result
 
 
 # -------------------------
 # Per-doc summarization
 # -------------------------
-def summarize_doc_with_llm(doc: Dict[str, Any], company: str, role: str) -> Dict[str, Any]:
+async def summarize_doc_with_llm(doc: Dict[str, Any], company: str, role: str) -> Dict[str, Any]:
     system_prompt = (
         "You are an assistant that extracts concise, factual information from a webpage."
         " Given the document text and its URL, return ONLY valid JSON with keys:"
         " summary (short 1-2 sentences), key_points (list), interview_questions (list),"
         " salary_mentions (list), quotes (list), source (url)."
     )
+    # Only the chunks most relevant to the research go into the prompt. Tokenizing and scoring a
+    # long page is CPU work, so it runs off the loop alongside the other summaries.
+    text = await asyncio.to_thread(select_relevant_text, doc.get("text") or "", research_query(company, role))
     user_payload = {
         "company": company,
         "role": role,
         "url": doc.get("url"),
         "title": doc.get("title"),
-        "text": (doc.get("text") or "")[:30000]
+        "text": text
     }
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": json.dumps(user_payload)}
     ]
     try:
-        res = llm_caller.llm_call("gemini-2.5-flash", messages)
+        res = await llm_caller.allm_call("gemini-2.5-flash", messages)
         print("[DEBUG] Full LLM response (summarize_doc_with_llm):", res)
 
         raw = getattr(res.choices[0].message, "content", None) if res else None
@@ -186,22 +231,50 @@ def summarize_doc_with_llm(doc: Dict[str, Any], company: str, role: str) -> Dict
         return {"summary": "", "key_points": [], "interview_questions": [], "salary_mentions": [], "quotes": [], "source": doc.get("url"), "error": str(e)}
 
 
+async def summarize_doc_bounded(doc: Dict[str, Any], company: str, role: str, sem: asyncio.Semaphore) -> Dict[str, Any]:
+    try:
+        async with sem:
+            try:
+                return await asyncio.wait_for(summarize_doc_with_llm(doc, company, role), SUMMARY_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                print(f"[DEBUG] summarize_doc_with_llm timed out for {doc.get('url')}")
+                return {"summary": "", "key_points": [], "interview_questions": [], "salary_mentions": [], "quotes": [], "source": doc.get("url"), "error": "timeout"}
+    except asyncio.CancelledError:
+        # Counts both summaries still waiting for a slot and those aborted mid-call.
+        incr_metric("cancellation", "agent_llm_calls_skipped")
+        raise
+
+
 # -------------------------
 # Aggregate
 # -------------------------
-def aggregate_with_llm(company: str, role: str, doc_summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def aggregate_with_llm(company: str, role: str, doc_summaries: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     system_prompt = (
         "You are a research summarization assistant. Given a list of per-document JSON summaries,"
         " synthesize and return ONLY VALID JSON with keys: company_insights, interview_prep, web_research, sources."
         " Each claim inside company_insights or interview_prep should list sources (URLs). Keep results concise and factual."
     )
-    user_payload = {"company": company, "role": role, "doc_summaries": doc_summaries}
+    # Drop empty summaries (failed or timed-out docs), then keep the most relevant ones within budget.
+    useful = [
+        d for d in doc_summaries
+        if d.get("summary") or d.get("key_points") or d.get("interview_questions")
+        or d.get("salary_mentions") or d.get("quotes")
+    ]
+    serialized = [json.dumps(d) for d in useful]
+
+    def select() -> Tuple[List[int], int]:
+        keep = select_within_budget(serialized, research_query(company, role), RELEVANCE_AGGREGATE_TOKEN_BUDGET)
+        return keep, sum(count_tokens(serialized[i]) for i in keep)
+
+    keep, tokens = await asyncio.to_thread(select)
+    print(f"[DEBUG] Aggregating {len(keep)}/{len(doc_summaries)} summaries, ~{tokens} tokens")
+    user_payload = {"company": company, "role": role, "doc_summaries": [useful[i] for i in keep]}
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": json.dumps(user_payload)}
     ]
     try:
-        res = llm_caller.llm_call("gemini-2.5-flash", messages)
+        res = await llm_caller.allm_call("gemini-2.5-flash", messages)
         print("[DEBUG] Full LLM response (aggregate_with_llm):", res)
 
         raw = getattr(res.choices[0].message, "content", None) if res else None
@@ -212,21 +285,209 @@ def aggregate_with_llm(company: str, role: str, doc_summaries: List[Dict[str, An
             return parsed
     except Exception as e:
         print("[DEBUG] aggregate_with_llm failed:", e)
-
-    return {
-        "company_insights": {"hiring_trends": [], "interview_process": [], "employee_experiences": []},
-        "interview_prep": {"technical_questions": [], "behavioral_questions": [], "company_specific_questions": [], "prep_tips": []},
-        "web_research": {"latest_news": []},
-        "sources": []
-    }
+    return None
 
 
 # -------------------------
 # Orchestration
 # -------------------------
+def _no_progress(stage: str, status: str, items_count: Optional[int] = None):
+    pass
+
+
+def _never_cancelled() -> bool:
+    return False
+
+
+async def research_company(company: str, role: str, report: ProgressReporter = _no_progress,
+                           cancelled: CancelCheck = _never_cancelled) -> Dict[str, Any]:
+    def checkpoint(next_stage: str):
+        if cancelled():
+            incr_metric("cancellation", f"agent_aborted_before:{next_stage}")
+            raise JobCancelled(f"{company}/{role}")
+
+    # Stage 1: Discovery
+    report("discovery", "running")
+    # DDGS is blocking; in a thread it no longer stalls the other jobs on an AsyncWorker loop.
+    urls = await asyncio.to_thread(discover_urls, company, role, cancelled=cancelled)
+    print(f"[DEBUG] Discovered URLs: {urls[:5]} (showing first 5)")
+    report("discovery", "done", len(urls))
+
+    # Stage 2: Fetch & Extract
+    checkpoint("fetch")
+    async with AsyncPageFetcher() as fetcher:
+        fetched_results = await asyncio.gather(*[fetch_and_extract(u, fetcher) for u in urls])
+    print(f"[DEBUG] Number of fetched results: {len(fetched_results)}")
+    print(f"[DEBUG] Served from page cache: {sum(1 for fr in fetched_results if fr.get('cached'))}")
+    await evict_pages()
+
+    candidates = [
+        {"url": fr.get("url"), "title": fr.get("title") or "", "text": fr["text"]}
+        for fr in fetched_results if fr.get("text")
+    ]
+    # Syndicated and mirrored pages differ by a few characters; keep the longest copy of each.
+    kept = await asyncio.to_thread(keep_longest, [d["text"] for d in candidates])
+    docs: List[Dict[str, Any]] = [candidates[i] for i in kept]
+    avoided = len(candidates) - len(docs)
+    if avoided:
+        incr_metric("research_dedup", "llm_calls_avoided", avoided)
+    print(f"[DEBUG] Deduped documents: {len(docs)} of {len(candidates)} ({avoided} near-duplicate summaries avoided)")
+    report("fetch", "done", len(docs))
+    if not docs:
+        # Usually a rate-limited search; caching this would hide the company for the whole TTL.
+        raise ResearchUnavailable(f"no documents found for {company} / {role}")
+
+    # Stage 3: Per-doc summarization (gather keeps the document order)
+    checkpoint("summarize")
+    summary_sem = asyncio.Semaphore(MAX_SUMMARY_CONCURRENCY)
+    doc_summaries: List[Dict[str, Any]] = await asyncio.gather(
+        *[summarize_doc_bounded(d, company, role, summary_sem) for d in docs]
+    )
+    print("[DEBUG] Sample doc summary:", json.dumps(doc_summaries[:1], indent=2))
+    report("summarize", "done", len(doc_summaries))
+
+    # Stage 4: Aggregate
+    checkpoint("aggregate")
+    aggregated = await aggregate_with_llm(company, role, doc_summaries)
+    print("[DEBUG] Aggregated result:", json.dumps(aggregated, indent=2))
+    if aggregated is None:
+        raise ResearchUnavailable(f"aggregation failed for {company} / {role}")
+    report("aggregate", "done")
+
+    return {
+        "company_insights": aggregated.get("company_insights", {}),
+        "interview_prep": aggregated.get("interview_prep", {}),
+        "web_research": aggregated.get("web_research", {}),
+    }
+
+
+def _publish_flushed(ids):
+    for _id in ids:
+        publish_status(str(_id))
+
+
+async def save_insights(file_ids: List[str], research: Dict[str, Any]):
+    for fid in file_ids:
+        # Uploads cancelled while waiting on shared research stay cancelled.
+        await files_collection.update_one(
+            {"_id": ObjectId(fid), "insights_status": {"$ne": "cancelled"}},
+            {"$set": {
+                "insights_status": "processed",
+                "agent_stage": "done",
+                **research,
+            }}
+        )
+        publish_status(fid)
+
+
+async def save_insights_error(file_ids: List[str], error: str):
+    for fid in file_ids:
+        await files_collection.update_one(
+            {"_id": ObjectId(fid), "insights_status": {"$ne": "cancelled"}},
+            {"$set": {"insights_status": "error", "agent_stage": "failed", "agent_error": error}}
+        )
+        publish_status(fid)
+
+
+def requeue_agent(file_id: str):
+    """Enqueue process_agent again under the upload's own job id, so /cancel can still find it."""
+    job_id = agent_job_id(file_id)
+    try:
+        # The waiter's first job finished when it joined; the id is reused, not its expiry.
+        Job.fetch(job_id, connection=redis_connection).delete()
+    except NoSuchJobError:
+        pass
+    research_q.enqueue(process_agent, file_id, job_id=job_id)
+
+
+async def run_research(key: str, company: str, role: str, file_ids: List[str]):
+    """Run the pipeline as owner of `key` and deliver the result to `file_ids` and any waiters.
+
+    The run is shared, so it is only aborted once the owner and every upload waiting on it have
+    been cancelled. Warm-ups (no file_ids) are never cancelled.
+    """
+    unwanted = False
+
+    async def should_cancel() -> bool:
+        nonlocal unwanted
+        if file_ids:
+            unwanted = await all_cancelled(file_ids + await get_waiters(key))
+        return unwanted
+
+    def cancelled() -> bool:
+        # Checkpoints and the search thread read the watcher's last answer; no I/O here.
+        return unwanted
+
+    try:
+        async with WriteCoalescer(files_collection, on_flush=_publish_flushed) as progress:
+            def report(stage: str, status: str, items_count: Optional[int] = None):
+                entry = {"stage": stage, "status": status, "items_count": items_count}
+                for fid in file_ids:
+                    progress.set(ObjectId(fid), {"agent_stage": stage})
+                    progress.push(ObjectId(fid), "agent_progress", entry)
+
+            # The watcher aborts in-flight fetch and LLM tasks; the search thread cannot be
+            # cancelled, so it checks between queries.
+            research = await run_cancellable(
+                research_company(company, role, report, cancelled), file_ids, should_cancel
+            )
+    except JobCancelled:
+        incr_metric("cancellation", "agent_pipelines_aborted")
+        waiters = await fail_research(key)
+        print(f"[Agent] research for {key} cancelled, handing off to {len(waiters)} waiter(s)")
+        # Uploads that joined after the last check still want the result: let one re-claim the key.
+        for fid in waiters:
+            requeue_agent(fid)
+        return
+    except asyncio.CancelledError:
+        # Worker shutdown or job timeout. Release the lease now, or this job once requeued (and
+        # every waiter) would find the key still "running" and wait on a run that no longer exists.
+        waiters = await fail_research(key)
+        print(f"[Agent] research for {key} interrupted, handing off to {len(waiters)} waiter(s)")
+        for fid in waiters:
+            requeue_agent(fid)
+        raise
+    except ResearchUnavailable as e:
+        # Typically a rate-limited search: release the key so the next upload retries, but let
+        # these uploads finish with empty insights, as before, rather than end in an error.
+        print(f"[Agent] research unavailable for {key}: {e}")
+        waiters = await fail_research(key)
+        await save_insights(file_ids + waiters, EMPTY_RESEARCH)
+        return
+    except Exception as e:
+        print(f"[Agent] research failed for {key}: {e}")
+        waiters = await fail_research(key)
+        await save_insights_error(file_ids + waiters, str(e))
+        return
+    waiters = await complete_research(key, research)
+    await save_insights(file_ids + waiters, research)
+    print(f"[Agent] research stored for {key}, delivered to {len(file_ids) + len(waiters)} uploads")
+
+
+async def join_research(key: str, file_id: str) -> bool:
+    """Attach `file_id` to the run that owns `key`, or deliver its fresh result. False if neither exists."""
+    waiting = await attach_waiter(key, file_id)
+    if waiting and waiting.get("attached"):
+        print(f"[Agent] joined in-flight research for {key}")
+        await files_collection.update_one(
+            {"_id": ObjectId(file_id)}, {"$set": {"agent_stage": "waiting for shared research"}}
+        )
+        publish_status(file_id)
+        return True
+    if waiting and waiting.get("result") is not None:
+        await save_insights([file_id], waiting["result"])
+        return True
+    return False
+
+
 async def process_agent(file_id: str):
     print(f"[Agent] start for ID {file_id}")
-    doc = await files_collection.find_one({"_id": ObjectId(file_id)})
+    record_queue_wait()
+    if is_cancelled(file_id):
+        print(f"[Agent] ID {file_id} cancelled before start, skipping")
+        incr_metric("cancellation", "agent_skipped:start")
+        return
+    doc = await get_file_fields(file_id, ("company_name", "position"))
     if not doc:
         print("[Agent] file not found")
         return
@@ -243,57 +504,37 @@ async def process_agent(file_id: str):
             "agent_progress": []
         }}
     )
+    publish_status(file_id)
 
+    key = research_key(company, role)
     try:
-        # Stage 1: Discovery
-        urls = discover_urls(company, role)
-        print(f"[DEBUG] Discovered URLs: {urls[:5]} (showing first 5)")
-        
-        # Stage 2: Fetch & Extract
-        sem = asyncio.Semaphore(MAX_FETCH_CONCURRENCY)
-        fetched_results = await asyncio.gather(*[fetch_and_extract(u, sem) for u in urls])
-        print(f"[DEBUG] Number of fetched results: {len(fetched_results)}")
-
-        docs: List[Dict[str, Any]] = []
-        seen_hashes = set()
-        for fr in fetched_results:
-            text = fr.get("text") or ""
-            if not text:
-                continue
-            h = hash_text(text[:20000])
-            if h in seen_hashes:
-                continue
-            seen_hashes.add(h)
-            docs.append({"url": fr.get("url"), "title": fr.get("title") or "", "text": text})
-        print(f"[DEBUG] Deduped documents: {len(docs)}")
-
-        # Stage 3: Per-doc summarization
-        doc_summaries: List[Dict[str, Any]] = []
-        for i, d in enumerate(docs):
-            summary = summarize_doc_with_llm(d, company, role)
-            doc_summaries.append(summary)
-        print("[DEBUG] Sample doc summary:", json.dumps(doc_summaries[:1], indent=2))
-
-        # Stage 4: Aggregate
-        aggregated = aggregate_with_llm(company, role, doc_summaries)
-        print("[DEBUG] Aggregated result:", json.dumps(aggregated, indent=2))
-
-        # Save final
-        await files_collection.update_one(
-            {"_id": ObjectId(file_id)},
-            {"$set": {
-                "insights_status": "processed",
-                "agent_stage": "done",
-                "company_insights": aggregated.get("company_insights", {}),
-                "interview_prep": aggregated.get("interview_prep", {}),
-                "web_research": aggregated.get("web_research", {}),
-            }}
-        )
+        cached = await get_fresh_research(key)
+        if cached is not None:
+            print(f"[Agent] research cache hit for {key}")
+            await save_insights([file_id], cached)
+            return
+
+        for _ in range(RESEARCH_CLAIM_ATTEMPTS):
+            if await claim_research(key, company, role, file_id):
+                break
+            if await join_research(key, file_id):
+                return
+            # The run we tried to join ended in between; race for the key again.
+        else:
+            raise RuntimeError(f"could not claim or join research for {key}")
+
+        await run_research(key, company, role, [file_id])
         print(f"[Agent] finished for ID {file_id}")
 
     except Exception as e:
         print(f"[Agent] failed for ID {file_id}: {e}")
-        await files_collection.update_one(
-            {"_id": ObjectId(file_id)},
-            {"$set": {"insights_status": "error", "agent_stage": "failed", "agent_error": str(e)}}
-        )
+        await save_insights_error([file_id], str(e))
+
+
+async def warm_research(company: str, role: str):
+    """Pre-compute research for (company, role) so later uploads hit the cache."""
+    key = research_key(company, role)
+    if not await claim_research(key, company, role, "warm"):
+        print(f"[Agent] research for {key} already running, skipping warm-up")
+        return
+    await run_research(key, company, role, [])
@@ -1,25 +1,24 @@
+import asyncio
 import json
 import os
-import base64
+from typing import List
 from bson import ObjectId
-from pdf2image import convert_from_path
 from dotenv import load_dotenv
-from ..db.collections.files import files_collection
+from ..db.collections.files import files_collection, get_job_details
+from .ingest import ingest_file, ingest_text, attach_artifact
+from .metrics import incr_metric, record_queue_wait
+from .events import publish_status
+from .cancellation import JobCancelled, is_cancelled, run_cancellable
 
-from app.agents.workflow import resume_workflow
-from app.agents.state import ResumeAnalysisState
-from app.llm_module.client_manager import LLMClientManager
-from app.llm_module.llm_caller import LLMCaller
+from app.llm_module.llm_caller import get_default_llm_caller
 from app.agents.prompts import SYSTEM_PROMPT
 
 load_dotenv()
-client_manager = LLMClientManager()
-llm_caller = LLMCaller(client_manager)
 
+# Send one request per page concurrently and merge, instead of one request with all pages.
+VISION_SPLIT_PAGES = os.getenv("VISION_SPLIT_PAGES", "false").lower() == "true"
 
-def encode_image(path: str) -> str:
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+llm_caller = get_default_llm_caller()
 
 
 def parse_llm_json_response(raw_content: str):
@@ -31,9 +30,73 @@ def parse_llm_json_response(raw_content: str):
         return None
 
 
+def build_vision_messages(prompt: str, pages_b64: List[str]) -> List[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": [{"type": "text", "text": prompt}] + [
+                {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{page}"}}
+                for page in pages_b64
+            ],
+        },
+    ]
+
+
+def merge_page_analyses(analyses: List[dict]) -> dict:
+    """Combine per-page analyses: average the scores and union the lists in page order."""
+    scores = [a["match_score"] for a in analyses if isinstance(a.get("match_score"), (int, float))]
+    merged = {
+        "match_score": round(sum(scores) / len(scores)) if scores else 0,
+        "overall_recommendations": " ".join(
+            a["overall_recommendations"] for a in analyses if a.get("overall_recommendations")
+        ),
+    }
+    for key in ("strengths", "weaknesses", "areas_for_improvement", "cv_optimization_suggestions",
+                "keywords_already_matched", "missing_keywords_to_add"):
+        items = []
+        for a in analyses:
+            for item in a.get(key) or []:
+                if item not in items:
+                    items.append(item)
+        merged[key] = items
+    return merged
+
+
+def skip_if_cancelled(file_id: str, stage: str) -> bool:
+    """True (and counted as saved work) when the upload was cancelled before `stage` started."""
+    if not is_cancelled(file_id):
+        return False
+    print(f"[Worker] ID {file_id} cancelled, skipping {stage}")
+    incr_metric("cancellation", f"jobfit_skipped:{stage}")
+    return True
+
+
+def record_llm_abort(file_id: str, calls: int):
+    print(f"[Worker] ID {file_id} cancelled, aborted {calls} in-flight LLM call(s)")
+    incr_metric("cancellation", "jobfit_llm_calls_aborted", calls)
+
+
 async def process_file(file_id: str, file_path: str):
     print(f"[Worker] process_file start for ID {file_id}")
-    doc = await files_collection.find_one({"_id": ObjectId(file_id)})
+    record_queue_wait()
+    if skip_if_cancelled(file_id, "ingest"):
+        return
+
+    artifact = await ingest_file(file_path)
+    await attach_artifact(file_id, artifact)
+
+    # Fast path: digitally generated PDFs carry a text layer, which skips the vision call.
+    if artifact["text"]:
+        print(f"[Worker] Using resume text ({len(artifact['text'])} chars) for ID {file_id}")
+        incr_metric("resume_ingest_path", "text_layer")
+        await analyze_text(file_id, artifact["text"])
+        return
+    incr_metric("resume_ingest_path", "vision")
+    if skip_if_cancelled(file_id, "vision"):
+        return
+
+    doc = await get_job_details(file_id)
     company = doc.get("company_name", "")
     job_description = doc.get("job_description", "")
     position = doc.get("position", "")
@@ -42,39 +105,19 @@ async def process_file(file_id: str, file_path: str):
     await files_collection.update_one(
         {"_id": ObjectId(file_id)}, {"$set": {"status": "processing"}}
     )
+    publish_status(file_id)
 
-    pages = convert_from_path(file_path)
-    print(f"[Worker] Converted PDF to {len(pages)} pages")
-    img_paths = []
-    for i, page in enumerate(pages):
-        img_path = f"/mnt/uploads/images/{file_id}/img-{i}.jpg"
-        os.makedirs(os.path.dirname(img_path), exist_ok=True)
-        page.save(img_path, "JPEG")
-        img_paths.append(img_path)
-
-    img_b64 = encode_image(img_paths[0])
+    pages_b64 = artifact["pages_b64"]
+    print(f"[Worker] Using {len(pages_b64)} PDF page(s), {sum(len(p) for p in pages_b64)} base64 bytes")
 
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": f"""Give me a detailed overall recommendation and precise match score of image of CV/Resume based on this specific job decription of company name - {company} for the postion of {position}. 
+    prompt = f"""Give me a detailed overall recommendation and precise match score of image(s) of CV/Resume based on this specific job decription of company name - {company} for the postion of {position}. 
                     Job Description: {job_description}. Response strictly in following JSON format strictly.
                     Example valid output:
                     {{
                     "match_score": 85,
                     "overall_recommendations": "Candidate fits well but should include more cloud skills experience..."
                     }}
-                    """,
-                },
-                {"type": "image_url", "image_url": {
-                    "url": f"data:image/jpeg;base64,{img_b64}"}},
-            ],
-        },
-    ]
+                    """
 
     # ✅ Safe defaults (always defined)
     match_score = 0
@@ -87,9 +130,21 @@ async def process_file(file_id: str, file_path: str):
     missing_keywords_to_add = []
 
     try:
-        res = llm_caller.llm_call("gemini-2.5-flash", messages)
-        raw_content = res.choices[0].message.content
-        analysis_result = parse_llm_json_response(raw_content) or {}
+        if VISION_SPLIT_PAGES and len(pages_b64) > 1:
+            # One call per page, concurrently, merged afterwards.
+            responses = await run_cancellable(asyncio.gather(
+                *[llm_caller.allm_call("gemini-2.5-flash", build_vision_messages(prompt, [page])) for page in pages_b64]
+            ), [file_id])
+            analysis_result = merge_page_analyses(
+                [parse_llm_json_response(res.choices[0].message.content) or {} for res in responses]
+            )
+        else:
+            # All pages in a single multimodal message.
+            res = await run_cancellable(
+                llm_caller.allm_call("gemini-2.5-flash", build_vision_messages(prompt, pages_b64)), [file_id]
+            )
+            raw_content = res.choices[0].message.content
+            analysis_result = parse_llm_json_response(raw_content) or {}
 
         match_score = analysis_result.get("match_score", 0)
         overall_recommendations = analysis_result.get(
@@ -108,12 +163,16 @@ async def process_file(file_id: str, file_path: str):
         print("score = ", match_score)
         print("SUMMARY = ", overall_recommendations)
 
+    except JobCancelled:
+        record_llm_abort(file_id, len(pages_b64) if VISION_SPLIT_PAGES else 1)
+        return
     except Exception as e:
         print(f"[Worker] LLM analysis failed: {e}")
         # keep defaults already set above
 
     await files_collection.update_one(
-        {"_id": ObjectId(file_id)},
+        # A cancel that lands after the last check must not be overwritten.
+        {"_id": ObjectId(file_id), "jobfit_status": {"$ne": "cancelled"}},
         {"$set": {
             "status": "processed",
             "jobfit_status": "processed",
@@ -127,16 +186,29 @@ async def process_file(file_id: str, file_path: str):
             "missing_keywords_to_add": missing_keywords_to_add,
         }}
     )
+    publish_status(file_id)
 
     print(f"[Worker] Updated DB for ID {file_id} with final results")
 
 
 async def process_text(file_id: str, resume_text: str):
     print(f"[Worker] process_text start for ID {file_id}")
+    record_queue_wait()
+    if skip_if_cancelled(file_id, "ingest"):
+        return
+    artifact = await ingest_text(resume_text)
+    await attach_artifact(file_id, artifact)
+    await analyze_text(file_id, artifact["text"])
+
+
+async def analyze_text(file_id: str, resume_text: str):
+    if skip_if_cancelled(file_id, "analysis"):
+        return
     await files_collection.update_one(
         {"_id": ObjectId(file_id)}, {"$set": {"status": "processing"}}
     )
-    doc = await files_collection.find_one({"_id": ObjectId(file_id)})
+    publish_status(file_id)
+    doc = await get_job_details(file_id)
     company = doc.get("company_name", "")
     job_description = doc.get("job_description", "")
     position = doc.get("position", "")
@@ -162,7 +234,7 @@ async def process_text(file_id: str, resume_text: str):
     missing_keywords_to_add = []
     result = {}
     try:
-        res = llm_caller.llm_call("gemini-2.5-flash", messages)
+        res = await run_cancellable(llm_caller.allm_call("gemini-2.5-flash", messages), [file_id])
         raw_content = res.choices[0].message.content
         analysis_result = parse_llm_json_response(raw_content)
 
@@ -180,6 +252,9 @@ async def process_text(file_id: str, resume_text: str):
         missing_keywords_to_add = analysis_result.get(
             "missing_keywords_to_add", [])
 
+    except JobCancelled:
+        record_llm_abort(file_id, 1)
+        return
     except Exception as e:
         print(f"[Worker] LLM analysis failed: {e}")
         match_score = None
@@ -193,7 +268,8 @@ async def process_text(file_id: str, resume_text: str):
         overall_recommendations = ""
 
     await files_collection.update_one(
-        {"_id": ObjectId(file_id)},
+        # A cancel that lands after the last check must not be overwritten.
+        {"_id": ObjectId(file_id), "jobfit_status": {"$ne": "cancelled"}},
         {"$set": {
             "status": "processed",
             "jobfit_status": "processed",
@@ -207,5 +283,6 @@ async def process_text(file_id: str, resume_text: str):
             "missing_keywords_to_add": missing_keywords_to_add,
         }}
     )
+    publish_status(file_id)
 
     print(f"[Worker] Updated DB for ID {file_id} with final results")
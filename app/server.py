@@ -1,15 +1,40 @@
-from fastapi import FastAPI, UploadFile, Form
+from fastapi import FastAPI, UploadFile, Form, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional, Tuple
 from bson import ObjectId
+import hashlib
 import json
 import asyncio
-from .utils.file import save_to_disk
-from .db.collections.files import files_collection, FileSchema
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from .utils.file import stream_to_disk, UploadTooLarge
+from .utils.dedup import submission_hash, find_reusable_submission
+from .queue.ingest import hash_text
+from .db.collections.files import (
+    files_collection, FileSchema, ensure_files_indexes, get_file_fields, get_linked_to,
+)
 from .queue.worker_analyser import process_file, process_text
-from app.queue.worker_agent import process_agent
-from .queue.q import q
+from app.queue.worker_agent import process_agent, warm_research
+from .queue.metrics import get_metrics, get_queue_stats
+from .queue.research_cache import research_key, invalidate_research
+from .queue.q import jobfit_q, research_q
+from .queue.retention import schedule_retention
+from .queue.events import publish_status, subscribe_status, wait_for_status, close_subscription
+from .queue.cancellation import request_cancel, jobfit_job_id, agent_job_id
+
+# Seconds between Mongo reads when no event source is available.
+POLL_INTERVAL = 2
+# Seconds to wait for a pushed status change before sending a heartbeat.
+HEARTBEAT_INTERVAL = 15
+# Set to false to force the polling fallback (e.g. to compare modes with app.benchmarks.sse_load).
+STREAM_PUSH_ENABLED = os.getenv("STREAM_PUSH_ENABLED", "true").lower() == "true"
+# Per-pipeline statuses after which nothing more will be written.
+TERMINAL_STATUSES = ["processed", "failed", "error", "cancelled"]
+# Admin endpoints are disabled unless this is set.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 
 app = FastAPI()
@@ -22,6 +47,12 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def on_startup():
+    await ensure_files_indexes()
+    schedule_retention()
+
+
 @app.post("/upload")
 async def upload(
     file: UploadFile = None,
@@ -32,49 +63,66 @@ async def upload(
 ):
     print(
         f"[Upload] Received upload. file: {bool(file)}, text length: {len(resume_text)}, company: {company_name}, position: {position}")
+    if file:
+        # Stream to a staging path first: the final path needs the file_id, and a
+        # duplicate submission never gets one of its own.
+        staging_path = f"/mnt/uploads/staging/{uuid.uuid4().hex}"
+        try:
+            _, resume_hash = await stream_to_disk(file, staging_path)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+    else:
+        resume_hash = hash_text(resume_text)
+    dedup_key = submission_hash(resume_hash, job_description, company_name, position)
+
     db_obj = FileSchema(
         name=(file.filename if file else "text-input"),
         status="saving",
         company_name=company_name,
         job_description=job_description,
-        position=position
+        position=position,
+        submission_hash=dedup_key,
+        created_at=datetime.now(timezone.utc)
     )
-    result = await files_collection.insert_one(db_obj)
-    file_id = str(result.inserted_id)
 
-    await files_collection.update_one(
-        {"_id": ObjectId(file_id)},
-        {"$set": {
-            "jobfit_status": "queued",
-            "insights_status": "queued",
-            "agent_progress": []
-        }}
+    existing = await find_reusable_submission(dedup_key)
+    if existing:
+        # Identical submission: follow the existing job instead of enqueuing new work.
+        db_obj.update(status="linked", linked_to=str(existing["_id"]))
+        result = await files_collection.insert_one(db_obj)
+        file_id = str(result.inserted_id)
+        print(f"[Upload] Duplicate of {existing['_id']}, linked as {file_id}")
+        if file:
+            os.remove(staging_path)
+        return {"file_id": file_id}
+
+    # Build the complete document up front so the hot path is a single insert.
+    oid = ObjectId()
+    file_id = str(oid)
+    db_obj.update(
+        _id=oid,
+        status="queued" if file else "processing",
+        jobfit_status="queued",
+        insights_status="queued",
+        agent_progress=[],
     )
 
     if file:
-        print(f"[Upload] Enqueue process_file for ID {file_id}")
         path = f"/mnt/uploads/{file_id}/{file.filename}"
-        await save_to_disk(await file.read(), path)
-        q.enqueue(process_file, file_id, path)
-        q.enqueue(process_agent, file_id)
-        await files_collection.update_one(
-            {"_id": ObjectId(file_id)},
-            {"$set": {"status": "queued", "jobfit_status": "queued",
-                      "insights_status": "queued"}}
-        )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(staging_path, path)
+
+    # Insert before enqueuing so workers always find the document.
+    await files_collection.insert_one(db_obj)
+
+    if file:
+        print(f"[Upload] Enqueue process_file for ID {file_id}")
+        jobfit_q.enqueue(process_file, file_id, path, job_id=jobfit_job_id(file_id))
+        research_q.enqueue(process_agent, file_id, job_id=agent_job_id(file_id))
     else:
         print(f"[Upload] Enqueue process_text for ID {file_id}")
-        # await files_collection.update_one(
-        #     {"_id": ObjectId(file_id)},
-        #     {"$set": {"status": "processing"}}
-        # )
-        q.enqueue(process_text, file_id, resume_text)
-        q.enqueue(process_agent, file_id)
-        await files_collection.update_one(
-            {"_id": ObjectId(file_id)},
-            {"$set": {"status": "processing",
-                      "jobfit_status": "queued", "insights_status": "queued"}}
-        )
+        jobfit_q.enqueue(process_text, file_id, resume_text, job_id=jobfit_job_id(file_id))
+        research_q.enqueue(process_agent, file_id, job_id=agent_job_id(file_id))
 
     print(f"[Upload] Returning file_id {file_id}")
     return {"file_id": file_id}
@@ -82,53 +130,173 @@ async def upload(
 
 @app.post("/cancel/{file_id}")
 async def cancel_processing(file_id: str):
+    # Flag first so running workers stop at their next check; queued jobs never start.
+    removed = request_cancel(file_id)
+    # Pipelines that already finished keep their results.
     await files_collection.update_one(
-        {"_id": ObjectId(file_id)}, {"$set": {"status": "cancelled"}}
+        {"_id": ObjectId(file_id)},
+        [{"$set": {
+            "status": "cancelled",
+            **{
+                field: {"$cond": [{"$in": [f"${field}", TERMINAL_STATUSES]}, f"${field}", "cancelled"]}
+                for field in ("jobfit_status", "insights_status")
+            },
+        }}],
     )
+    publish_status(file_id)
+    print(f"[Cancel] ID {file_id} cancelled, {removed} queued job(s) removed")
     return {"message": "Processing cancelled"}
 
+# Fields sent to the browser, with the default used when a worker has not set them yet.
+STREAM_FIELDS = {
+    "status": "",
+    "jobfit_status": "",
+    "insights_status": "",
+    "agent_stage": "",
+    "agent_progress": [],
+    "result": None,
+    "score": 0,
+    "strengths": [],
+    "weaknesses": [],
+    "areas_for_improvement": [],
+    "cv_optimization_suggestions": [],
+    "keywords_already_matched": [],
+    "missing_keywords_to_add": [],
+    "company_insights": {},
+    "interview_prep": {},
+    "web_research": {},
+}
+
+
+def _field_digest(value) -> str:
+    return hashlib.blake2b(json.dumps(value, sort_keys=True).encode("utf-8"), digest_size=4).hexdigest()
+
+
+def _parse_event_id(event_id: Optional[str]) -> Dict[str, str]:
+    """Map field name -> digest from an event id produced by `_event_id`."""
+    digests = (event_id or "").split(".")
+    if len(digests) != len(STREAM_FIELDS):
+        return {}
+    return dict(zip(STREAM_FIELDS, digests))
+
+
+def _stream_delta(db_file: dict, sent_digests: Dict[str, str]) -> Tuple[dict, Dict[str, str]]:
+    """The fields whose digest differs from `sent_digests`, and the digests of every field."""
+    delta = {}
+    digests = {}
+    for field, default in STREAM_FIELDS.items():
+        value = db_file.get(field, default)
+        digests[field] = _field_digest(value)
+        if sent_digests.get(field) != digests[field]:
+            delta[field] = value
+    return delta, digests
+
+
+def _event_id(digests: Dict[str, str]) -> str:
+    # The id carries a digest per field, so a reconnecting client can be sent only
+    # the fields that changed while it was away without any server-side session.
+    return ".".join(digests[field] for field in STREAM_FIELDS)
+
+
+async def _resolve_stream_target(file_id: str) -> str:
+    return await get_linked_to(file_id) or file_id
+
+
+def _require_admin(token: Optional[str]):
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.delete("/admin/research")
+async def invalidate_research_cache(
+    company_name: str,
+    position: str = "",
+    x_admin_token: Optional[str] = Header(None)
+):
+    _require_admin(x_admin_token)
+    key = research_key(company_name, position)
+    deleted = await invalidate_research(key)
+    return {"key": key, "invalidated": bool(deleted)}
+
+
+@app.post("/admin/research/warm")
+async def warm_research_cache(
+    company_name: str = Form(...),
+    position: str = Form(""),
+    x_admin_token: Optional[str] = Header(None)
+):
+    _require_admin(x_admin_token)
+    research_q.enqueue(warm_research, company_name, position)
+    return {"key": research_key(company_name, position), "message": "Warm-up queued"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return get_metrics()
+
+
+@app.get("/metrics/queues")
+async def queue_metrics():
+    # Polled by monitoring, so it also re-arms retention if its last run was lost.
+    schedule_retention()
+    return get_queue_stats()
+
+
 @app.get("/stream/{file_id}")
-async def stream_file_status(file_id: str):
+async def stream_file_status(file_id: str, last_event_id: Optional[str] = Header(None)):
     async def event_generator() -> AsyncGenerator[str, None]:
-        while True:
-            db_file = await files_collection.find_one({"_id": ObjectId(file_id)})
-            if not db_file:
-                yield f"data: {json.dumps({'error': 'File not found'})}\n\n"
-                break
-
-            # always yield current state
-            data = {
-                "_id": str(db_file["_id"]),
-                "status": db_file.get("status", ""),
-                "jobfit_status": db_file.get("jobfit_status", ""),
-                "insights_status": db_file.get("insights_status", ""),
-                "agent_stage": db_file.get("agent_stage", ""),
-                "agent_progress": db_file.get("agent_progress", []),
-                "result": db_file.get("result"),
-                "score": db_file.get("score", 0),
-                "strengths": db_file.get("strengths", []),
-                "weaknesses": db_file.get("weaknesses", []),
-                "areas_for_improvement": db_file.get("areas_for_improvement", []),
-                "cv_optimization_suggestions": db_file.get("cv_optimization_suggestions", []),
-                "keywords_already_matched": db_file.get("keywords_already_matched", []),
-                "missing_keywords_to_add": db_file.get("missing_keywords_to_add", []),
-                "company_insights": db_file.get("company_insights", {}),
-                "interview_prep": db_file.get("interview_prep", {}),
-                "web_research": db_file.get("web_research", {}),
-            }
-            yield f"data: {json.dumps(data)}\n\n"
-
-            # ✅ Only exit when both are processed OR error
-            if (
-                db_file.get("jobfit_status") in ["processed", "failed", "error"]
-                and db_file.get("insights_status") in ["processed", "failed", "error"]
-            ):
-                break
-
-            # ✅ heartbeat (prevents browser timeout)
-            yield "data: {}\n\n"
-
-            await asyncio.sleep(2)
+        sent_digests = _parse_event_id(last_event_id)
+        # Deduplicated uploads stream the job they were linked to.
+        stream_id = await _resolve_stream_target(file_id)
+        last_sent = time.monotonic()
+
+        # Subscribe before the first read so no change between the read and the
+        # wait can be missed.
+        pubsub = await subscribe_status(stream_id) if STREAM_PUSH_ENABLED else None
+        try:
+            while True:
+                db_file = await get_file_fields(stream_id, STREAM_FIELDS)
+                if not db_file:
+                    yield f"data: {json.dumps({'error': 'File not found'})}\n\n"
+                    break
+
+                # First message is a full snapshot, later ones only carry changed fields.
+                first = not sent_digests
+                delta, digests = _stream_delta(db_file, sent_digests)
+                if first:
+                    delta["_id"] = file_id
+                if delta:
+                    yield f"id: {_event_id(digests)}\ndata: {json.dumps(delta)}\n\n"
+                    sent_digests = digests
+                    last_sent = time.monotonic()
+
+                # ✅ Only exit when both are processed OR error
+                if (
+                    db_file.get("jobfit_status") in TERMINAL_STATUSES
+                    and db_file.get("insights_status") in TERMINAL_STATUSES
+                ):
+                    break
+
+                if pubsub is None:
+                    # ✅ heartbeat (prevents browser timeout); comments are not delivered to onmessage
+                    if time.monotonic() - last_sent >= HEARTBEAT_INTERVAL:
+                        yield ": heartbeat\n\n"
+                        last_sent = time.monotonic()
+                    await asyncio.sleep(POLL_INTERVAL)
+                    continue
+
+                # Wait for a worker to publish a change; only heartbeat while idle.
+                try:
+                    while not await wait_for_status(pubsub, HEARTBEAT_INTERVAL):
+                        yield ": heartbeat\n\n"
+                        last_sent = time.monotonic()
+                except Exception as e:
+                    print(f"[Stream] event source lost for ID {file_id}, falling back to polling: {e}")
+                    await close_subscription(pubsub)
+                    pubsub = None
+        finally:
+            if pubsub is not None:
+                await close_subscription(pubsub)
 
     return StreamingResponse(
         event_generator(),
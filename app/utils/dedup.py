@@ -0,0 +1,51 @@
+import hashlib
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from dotenv import load_dotenv
+from ..db.collections.files import files_collection
+from ..queue.ingest import normalize_text
+
+load_dotenv()
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+# Completed results younger than this are reused for identical submissions.
+DEDUP_MAX_AGE_SECONDS = int(os.getenv("DEDUP_MAX_AGE_SECONDS", str(24 * 3600)))
+# In-flight jobs older than this are assumed stuck and are not joined.
+DEDUP_INFLIGHT_MAX_SECONDS = int(os.getenv("DEDUP_INFLIGHT_MAX_SECONDS", "1800"))
+
+_DONE = ["processed"]
+_FAILED = ["failed", "error"]
+
+
+def submission_hash(resume_hash: str, job_description: str, company: str, position: str) -> str:
+    """Key for one (resume, JD, company, position) submission; resume_hash is the ingest artifact id."""
+    parts = [resume_hash] + [normalize_text(v).lower() for v in (job_description, company, position)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def find_reusable_submission(key: str) -> Optional[Dict[str, Any]]:
+    """Most recent original submission with this key that is either fresh and complete, or still running."""
+    if not DEDUP_ENABLED:
+        return None
+    now = datetime.now(timezone.utc)
+    cursor = files_collection.find(
+        {
+            "submission_hash": key,
+            "linked_to": {"$exists": False},
+            "status": {"$ne": "cancelled"},
+            "created_at": {"$gte": now - timedelta(seconds=DEDUP_MAX_AGE_SECONDS)},
+        },
+        {"jobfit_status": 1, "insights_status": 1, "created_at": 1},
+    ).sort("created_at", -1).limit(1)
+    async for doc in cursor:
+        statuses = (doc.get("jobfit_status"), doc.get("insights_status"))
+        if any(s in _FAILED for s in statuses):
+            return None
+        if all(s in _DONE for s in statuses):
+            return doc
+        # pymongo returns naive UTC datetimes
+        created_at = doc["created_at"].replace(tzinfo=timezone.utc)
+        if now - created_at < timedelta(seconds=DEDUP_INFLIGHT_MAX_SECONDS):
+            return doc
+    return None
@@ -1,9 +1,49 @@
+import hashlib
 import os
+from typing import Tuple
 import aiofiles
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+
+class UploadTooLarge(Exception):
+    pass
+
 
 async def save_to_disk(file: bytes, path: str) -> bool:
     os.makedirs(os.path.dirname(path),exist_ok=True)
     async with aiofiles.open(path, "wb") as out_file:
         await out_file.write(file)
 
-    return True
\ No newline at end of file
+    return True
+
+
+async def stream_to_disk(
+    upload: UploadFile,
+    path: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+    chunk_size: int = UPLOAD_CHUNK_BYTES,
+) -> Tuple[int, str]:
+    """Copy an upload to `path` chunk by chunk, hashing as it goes.
+
+    Returns (size, sha256 hex). Raises UploadTooLarge, and removes the partial file,
+    once more than `max_bytes` have been read.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(path, "wb") as out_file:
+            while chunk := await upload.read(chunk_size):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                await out_file.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return size, digest.hexdigest()
@@ -0,0 +1,82 @@
+import os
+import re
+import zlib
+from typing import Dict, List, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Estimated Jaccard similarity of word shingles above which two pages count as the same document.
+NEARDUP_THRESHOLD = float(os.getenv("NEARDUP_THRESHOLD", "0.8"))
+NEARDUP_SHINGLE_WORDS = int(os.getenv("NEARDUP_SHINGLE_WORDS", "5"))
+# Only the first words of a page are fingerprinted, which bounds the cost on very long pages.
+NEARDUP_MAX_WORDS = int(os.getenv("NEARDUP_MAX_WORDS", "5000"))
+
+# 32 bands of 4 rows: pairs at Jaccard 0.8 share a band with probability > 0.9999. Weaker
+# candidates that also collide are rejected on the full signature.
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, k: int = NEARDUP_SHINGLE_WORDS) -> np.ndarray:
+    """CRC32s of the distinct k-word shingles of `text`."""
+    words = _WORD_RE.findall(text.lower())[:NEARDUP_MAX_WORDS]
+    if len(words) < k:
+        grams = {" ".join(words)}
+    else:
+        grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text: str) -> np.ndarray:
+    hashes = shingles(text)
+    # a < 2^31 and h < 2^32 keep a*h + b inside uint64.
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def cluster_near_duplicates(texts: Sequence[str], threshold: float = NEARDUP_THRESHOLD) -> List[List[int]]:
+    """Group indices of `texts` whose estimated similarity reaches `threshold`, each cluster in input order.
+
+    LSH banding proposes candidate pairs; each candidate is confirmed on the full signature.
+    """
+    signatures = [minhash(t) for t in texts]
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(BANDS):
+        buckets: Dict[bytes, List[int]] = {}
+        for i, sig in enumerate(signatures):
+            buckets.setdefault(sig[band * ROWS:(band + 1) * ROWS].tobytes(), []).append(i)
+        for members in buckets.values():
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    a, b = find(i), find(j)
+                    if a != b and similarity(signatures[i], signatures[j]) >= threshold:
+                        parent[max(a, b)] = min(a, b)
+
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(clusters.values())
+
+
+def keep_longest(texts: Sequence[str], threshold: float = NEARDUP_THRESHOLD) -> List[int]:
+    """Index of the longest text in each near-duplicate cluster, in cluster order."""
+    return [max(cluster, key=lambda i: len(texts[i])) for cluster in cluster_near_duplicates(texts, threshold)]
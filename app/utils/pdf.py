@@ -0,0 +1,103 @@
+import base64
+import io
+import os
+import subprocess
+from typing import List, Optional
+from pdf2image import convert_from_path
+
+# Rasterization settings for resume pages sent to the vision model.
+RASTER_DPI = int(os.getenv("RASTER_DPI", "150"))
+RASTER_GRAYSCALE = os.getenv("RASTER_GRAYSCALE", "true").lower() == "true"
+RASTER_JPEG_QUALITY = int(os.getenv("RASTER_JPEG_QUALITY", "80"))
+
+
+# Downscaling stops here; below this width resume text stops being legible to the model.
+RASTER_MIN_WIDTH = 800
+_QUALITY_STEPS = (RASTER_JPEG_QUALITY, 65, 50, 40)
+
+
+def _encode_jpeg(page, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    page.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _encode_within(page, max_bytes: Optional[int], jpeg_quality: int) -> bytes:
+    """Encode a page, lowering JPEG quality then resolution until it fits `max_bytes`."""
+    qualities = [q for q in _QUALITY_STEPS if q <= jpeg_quality] or [jpeg_quality]
+    while True:
+        for quality in qualities:
+            data = _encode_jpeg(page, quality)
+            if max_bytes is None or len(data) <= max_bytes:
+                return data
+        width, height = page.size
+        if width * 3 // 4 < RASTER_MIN_WIDTH:
+            return data
+        page = page.resize((width * 3 // 4, height * 3 // 4))
+
+
+def render_pages_b64(
+    file_path: str,
+    max_pages: int = 1,
+    dpi: int = RASTER_DPI,
+    grayscale: bool = RASTER_GRAYSCALE,
+    jpeg_quality: int = RASTER_JPEG_QUALITY,
+    max_total_bytes: Optional[int] = None,
+) -> List[str]:
+    """Rasterize the first `max_pages` pages and return them as base64 JPEGs.
+
+    Only the requested pages are rendered and the JPEGs are encoded in memory, so
+    cost does not grow with the length of the PDF and nothing is written to disk.
+    With `max_total_bytes`, the base64 payload is split evenly across pages and each
+    page is recompressed or downscaled to fit its share.
+    """
+    pages = convert_from_path(
+        file_path,
+        dpi=dpi,
+        first_page=1,
+        last_page=max_pages,
+        grayscale=grayscale,
+    )
+    # base64 inflates by 4/3
+    per_page_bytes = max_total_bytes * 3 // 4 // len(pages) if max_total_bytes and pages else None
+    encoded = []
+    for page in pages:
+        data = _encode_within(page, per_page_bytes, jpeg_quality)
+        encoded.append(base64.b64encode(data).decode())
+        page.close()
+    return encoded
+
+
+# A text layer shorter than this is treated as missing (scans often carry a few stray glyphs).
+TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "300"))
+TEXT_LAYER_MAX_PAGES = int(os.getenv("TEXT_LAYER_MAX_PAGES", "5"))
+
+
+def extract_text_layer(file_path: str, max_pages: int = TEXT_LAYER_MAX_PAGES) -> str:
+    """Return the PDF's embedded text via poppler's pdftotext, or "" if there is none."""
+    try:
+        result = subprocess.run(
+            ["pdftotext", "-layout", "-f", "1", "-l", str(max_pages), file_path, "-"],
+            capture_output=True,
+            timeout=30,
+            check=True,
+        )
+    except (subprocess.SubprocessError, OSError) as e:
+        print(f"[PDF] pdftotext failed for {file_path}: {e}")
+        return ""
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def is_usable_text(text: str, min_chars: int = TEXT_LAYER_MIN_CHARS) -> bool:
+    """Heuristic for whether a text layer is a real resume rather than OCR noise or an empty scan."""
+    stripped = "".join(text.split())
+    if len(stripped) < min_chars:
+        return False
+    # Mostly letters/digits, not replacement characters or symbol soup.
+    alnum_ratio = sum(c.isalnum() for c in stripped) / len(stripped)
+    if alnum_ratio < 0.6 or text.count("�") > len(stripped) * 0.01:
+        return False
+    # Real prose has words of normal length; broken encodings give long runs or single glyphs.
+    words = text.split()
+    wordlike = sum(1 for w in words if 2 <= len(w) <= 20 and any(c.isalpha() for c in w))
+    return wordlike / len(words) >= 0.5
@@ -0,0 +1,137 @@
+import os
+import re
+from typing import List, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Estimated prompt tokens allowed for one page's text in the per-doc summary call.
+RELEVANCE_DOC_TOKEN_BUDGET = int(os.getenv("RELEVANCE_DOC_TOKEN_BUDGET", "3000"))
+# Estimated prompt tokens allowed for the per-doc summaries in the aggregate call.
+RELEVANCE_AGGREGATE_TOKEN_BUDGET = int(os.getenv("RELEVANCE_AGGREGATE_TOKEN_BUDGET", "12000"))
+# Paragraphs are merged or split into chunks of roughly this many characters before scoring.
+RELEVANCE_CHUNK_CHARS = int(os.getenv("RELEVANCE_CHUNK_CHARS", "800"))
+# Added to company and role when ranking page chunks and summaries for the research prompts.
+RESEARCH_INTENT = "interview process questions rounds experience hiring salary compensation culture news"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how i in is it its of on or our that the this to was we what"
+    " when which who will with you your".split()
+)
+_TERM_RE = re.compile(r"[a-z0-9]+")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n|\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+_encoding = None
+_encoding_failed = False
+
+
+def count_tokens(text: str) -> int:
+    """Local prompt size estimate: tiktoken's cl100k_base when available, else ~4 characters per token."""
+    global _encoding, _encoding_failed
+    if not text:
+        return 0
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # The encoding file is downloaded on first use; offline workers fall back to the estimate.
+            _encoding_failed = True
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def terms(text: str) -> List[str]:
+    return [t for t in _TERM_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def split_chunks(text: str, max_chars: int = RELEVANCE_CHUNK_CHARS) -> List[str]:
+    """Split on paragraph breaks, merging short paragraphs and cutting long ones at sentence ends."""
+    pieces: List[str] = []
+    for para in _PARAGRAPH_RE.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if len(para) <= max_chars:
+            pieces.append(para)
+            continue
+        current = ""
+        for sentence in _SENTENCE_RE.split(para):
+            while len(sentence) > max_chars:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(sentence[:max_chars])
+                sentence = sentence[max_chars:]
+            if current and len(current) + len(sentence) + 1 > max_chars:
+                pieces.append(current)
+                current = ""
+            current = f"{current} {sentence}" if current else sentence
+        if current:
+            pieces.append(current)
+
+    chunks: List[str] = []
+    for piece in pieces:
+        if chunks and len(chunks[-1]) + len(piece) + 1 <= max_chars:
+            chunks[-1] = f"{chunks[-1]}\n{piece}"
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def bm25_scores(chunks: Sequence[str], query: str) -> np.ndarray:
+    """BM25 score of every chunk against `query`, treating the chunks as the corpus."""
+    query_terms = sorted(set(terms(query)))
+    if not chunks or not query_terms:
+        return np.zeros(len(chunks))
+    column = {t: i for i, t in enumerate(query_terms)}
+
+    tf = np.zeros((len(chunks), len(query_terms)))
+    lengths = np.zeros(len(chunks))
+    for row, chunk in enumerate(chunks):
+        chunk_terms = terms(chunk)
+        lengths[row] = len(chunk_terms)
+        for t in chunk_terms:
+            col = column.get(t)
+            if col is not None:
+                tf[row, col] += 1
+
+    n = len(chunks)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    avg_len = lengths.mean() or 1.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_len)
+    return ((tf * (BM25_K1 + 1)) / (tf + norm[:, None])) @ idf
+
+
+def select_within_budget(texts: Sequence[str], query: str, token_budget: int) -> List[int]:
+    """Indices of the best-scoring texts whose estimated tokens fit the budget, in original order.
+
+    Ties keep the earlier text, so pages with no matching terms degrade to a head truncation.
+    """
+    scores = bm25_scores(texts, query)
+    order = np.argsort(-scores, kind="stable")
+    chosen: List[int] = []
+    used = 0
+    for i in order:
+        cost = count_tokens(texts[i])
+        if used + cost > token_budget:
+            continue
+        chosen.append(int(i))
+        used += cost
+    return sorted(chosen)
+
+
+def select_relevant_text(text: str, query: str, token_budget: int = RELEVANCE_DOC_TOKEN_BUDGET) -> str:
+    """Text reduced to its most relevant chunks for `query`; unchanged when it already fits."""
+    if count_tokens(text) <= token_budget:
+        return text
+    chunks = split_chunks(text)
+    return "\n\n".join(chunks[i] for i in select_within_budget(chunks, query, token_budget))
+
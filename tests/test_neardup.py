@@ -0,0 +1,97 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+
+from app.utils.neardup import cluster_near_duplicates, keep_longest, minhash, similarity
+
+WORDS = (
+    "interview process round onsite recruiter offer salary team manager coding system design behavioral"
+    " question answer experience company culture remote hybrid office benefits equity bonus level senior"
+    " junior engineer product data platform infrastructure backend frontend mobile review feedback week"
+).split()
+
+
+def article(seed: int, length: int = 400) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def mirror(text: str, seed: int, edits: int = 3, boilerplate: bool = True) -> str:
+    """A syndicated copy: a few words changed and, by default, site boilerplate around it."""
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = "syndicated"
+    body = " ".join(words)
+    if not boilerplate:
+        return body
+    return "Home | Careers | Blog | Newsletter | Contact\n" + body + "\nShare this article. Cookie settings."
+
+
+def test_near_duplicates_share_a_cluster():
+    original = article(1)
+    texts = [original, mirror(original, 10), mirror(original, 11)]
+
+    assert similarity(minhash(texts[0]), minhash(texts[1])) >= 0.8
+    assert cluster_near_duplicates(texts) == [[0, 1, 2]]
+
+
+def test_distinct_pages_stay_separate():
+    texts = [article(seed) for seed in range(5)]
+
+    assert cluster_near_duplicates(texts) == [[i] for i in range(5)]
+
+
+def test_mixed_corpus_keeps_longest_copy_per_cluster():
+    a, b = article(1), article(2)
+    texts = [a, article(3), mirror(b, 20), mirror(a, 21, boilerplate=False), b, mirror(a, 22)]
+
+    assert cluster_near_duplicates(texts) == [[0, 3, 5], [1], [2, 4]]
+    # The copies with boilerplate are the longest of their clusters.
+    assert keep_longest(texts) == [5, 1, 2]
+
+
+def test_research_counts_llm_calls_avoided(monkeypatch):
+    from app.queue import worker_agent
+
+    a, b = article(1), article(2)
+    pages = {
+        "https://a.example/post": a,
+        "https://mirror1.example/a": mirror(a, 30),
+        "https://mirror2.example/a": mirror(a, 31),
+        "https://b.example/post": b,
+        "https://mirror.example/b": mirror(b, 32),
+        "https://c.example/post": article(3),
+    }
+    metrics, summarized = [], []
+
+    @asynccontextmanager
+    async def fetcher():
+        yield None
+
+    async def fetch(url, _fetcher):
+        return {"url": url, "title": "", "text": pages[url]}
+
+    async def no_eviction():
+        return 0
+
+    async def summarize(doc, company, role, sem):
+        summarized.append(doc["url"])
+        return {"summary": doc["url"], "source": doc["url"]}
+
+    async def aggregate(company, role, doc_summaries):
+        return {"company_insights": {}, "interview_prep": {}, "web_research": {}}
+
+    monkeypatch.setattr(worker_agent, "discover_urls", lambda *args, **kwargs: list(pages))
+    monkeypatch.setattr(worker_agent, "AsyncPageFetcher", fetcher)
+    monkeypatch.setattr(worker_agent, "fetch_and_extract", fetch)
+    monkeypatch.setattr(worker_agent, "evict_pages", no_eviction)
+    monkeypatch.setattr(worker_agent, "summarize_doc_bounded", summarize)
+    monkeypatch.setattr(worker_agent, "aggregate_with_llm", aggregate)
+    monkeypatch.setattr(worker_agent, "incr_metric", lambda *args: metrics.append(args))
+
+    asyncio.run(worker_agent.research_company("Acme", "Engineer"))
+
+    assert len(summarized) == 3
+    assert "https://c.example/post" in summarized
+    assert metrics == [("research_dedup", "llm_calls_avoided", 3)]
@@ -0,0 +1,21 @@
+from app.queue.url_ranking import rank_urls, registered_domain
+
+
+def test_registered_domain_strips_subdomains():
+    assert registered_domain("https://www.sap.de/careers") == "sap.de"
+    assert registered_domain("https://jobs.sap.de/") == "sap.de"
+    assert registered_domain("https://uk.glassdoor.com/Interview") == "glassdoor.com"
+
+
+def test_registered_domain_keeps_second_level_suffixes():
+    assert registered_domain("https://www.glassdoor.co.uk/Reviews") == "glassdoor.co.uk"
+    assert registered_domain("https://www.abc.net.au/news") == "abc.net.au"
+
+
+def test_subdomains_share_the_domain_quota():
+    candidates = [
+        {"url": url, "title": "", "snippet": "", "queries": [0], "best_rank": rank}
+        for rank, url in enumerate(["https://www.sap.de/a", "https://jobs.sap.de/b", "https://news.sap.de/c"])
+    ]
+
+    assert len(rank_urls(candidates, "SAP", "interview", 1, 3, k=10, max_per_domain=2)) == 2
@@ -43,16 +43,22 @@ export default function App() {
         `http://localhost:8000/stream/${fileStatus.file_id}`
       );
   
+      // the server sends one full snapshot, then only the fields that changed
+      let streamState = {};
+
       eventSource.onmessage = (event) => {
         try {
-          const data = JSON.parse(event.data);
-          console.log("SSE update:", data);
+          const delta = JSON.parse(event.data);
+          console.log("SSE update:", delta);
   
-          if (data.error) {
-            setProcessingProgress(`Error: ${data.error}`);
+          if (delta.error) {
+            setProcessingProgress(`Error: ${delta.error}`);
             eventSource.close();
             return;
           }
+
+          streamState = { ...streamState, ...delta };
+          const data = streamState;
   
           // update statuses
           setProcessingProgress(data.status || "");